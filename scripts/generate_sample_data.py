@@ -9,178 +9,278 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from database import DatabaseManager
-from datetime import datetime, timedelta
-import random
+from datetime import datetime, date, timedelta
+from itertools import repeat
+from typing import Dict, Iterator, Optional, Sequence
+import multiprocessing
+import numpy as np
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def generate_sample_aws_data(days: int = 30) -> list:
-    """Generate sample AWS usage data."""
-    
-    # Free tier services with realistic usage patterns
-    services_config = {
-        'Amazon Elastic Compute Cloud - Compute': {
-            't2.micro': {
-                'base_usage': 20,  # hours per day
-                'variation': 5,
-                'limit': 750,  # monthly limit
-                'unit': 'hours',
-                'cost_per_unit': 0.0116  # cost if over limit
-            }
+# Free tier services with realistic usage patterns
+_SERVICES_CONFIG = {
+    'Amazon Elastic Compute Cloud - Compute': {
+        't2.micro': {
+            'base_usage': 20,  # hours per day
+            'variation': 5,
+            'limit': 750,  # monthly limit
+            'unit': 'hours',
+            'cost_per_unit': 0.0116  # cost if over limit
+        }
+    },
+    'Amazon Simple Storage Service': {
+        'Standard Storage': {
+            'base_usage': 2.5,  # GB
+            'variation': 0.5,
+            'limit': 5,
+            'unit': 'GB',
+            'cost_per_unit': 0.023
         },
-        'Amazon Simple Storage Service': {
-            'Standard Storage': {
-                'base_usage': 2.5,  # GB
-                'variation': 0.5,
-                'limit': 5,
-                'unit': 'GB',
-                'cost_per_unit': 0.023
-            },
-            'GET Requests': {
-                'base_usage': 500,  # requests per day
-                'variation': 200,
-                'limit': 20000,  # monthly
-                'unit': 'requests',
-                'cost_per_unit': 0.0004
-            }
+        'GET Requests': {
+            'base_usage': 500,  # requests per day
+            'variation': 200,
+            'limit': 20000,  # monthly
+            'unit': 'requests',
+            'cost_per_unit': 0.0004
+        }
+    },
+    'AWS Lambda': {
+        'Requests': {
+            'base_usage': 25000,  # requests per day
+            'variation': 10000,
+            'limit': 1000000,  # monthly
+            'unit': 'requests',
+            'cost_per_unit': 0.0000002
         },
-        'AWS Lambda': {
-            'Requests': {
-                'base_usage': 25000,  # requests per day
-                'variation': 10000,
-                'limit': 1000000,  # monthly
-                'unit': 'requests',
-                'cost_per_unit': 0.0000002
-            },
-            'Duration': {
-                'base_usage': 8000,  # GB-seconds per day
-                'variation': 3000,
-                'limit': 400000,  # monthly
-                'unit': 'GB-seconds',
-                'cost_per_unit': 0.0000166667
-            }
+        'Duration': {
+            'base_usage': 8000,  # GB-seconds per day
+            'variation': 3000,
+            'limit': 400000,  # monthly
+            'unit': 'GB-seconds',
+            'cost_per_unit': 0.0000166667
+        }
+    },
+    'Amazon Relational Database Service': {
+        'db.t2.micro': {
+            'base_usage': 18,  # hours per day
+            'variation': 2,
+            'limit': 750,  # monthly
+            'unit': 'hours',
+            'cost_per_unit': 0.017
         },
-        'Amazon Relational Database Service': {
-            'db.t2.micro': {
-                'base_usage': 18,  # hours per day
-                'variation': 2,
-                'limit': 750,  # monthly
-                'unit': 'hours',
-                'cost_per_unit': 0.017
-            },
-            'Storage': {
-                'base_usage': 8,  # GB
-                'variation': 2,
-                'limit': 20,  # monthly
-                'unit': 'GB',
-                'cost_per_unit': 0.10
-            }
+        'Storage': {
+            'base_usage': 8,  # GB
+            'variation': 2,
+            'limit': 20,  # monthly
+            'unit': 'GB',
+            'cost_per_unit': 0.10
+        }
+    },
+    'Amazon DynamoDB': {
+        'Storage': {
+            'base_usage': 12,  # GB
+            'variation': 3,
+            'limit': 25,  # always free
+            'unit': 'GB',
+            'cost_per_unit': 0.25
         },
-        'Amazon DynamoDB': {
-            'Storage': {
-                'base_usage': 12,  # GB
-                'variation': 3,
-                'limit': 25,  # always free
-                'unit': 'GB',
-                'cost_per_unit': 0.25
-            },
-            'Read Capacity': {
-                'base_usage': 15,  # RCU
-                'variation': 5,
-                'limit': 25,
-                'unit': 'RCU',
-                'cost_per_unit': 0.00013
-            }
+        'Read Capacity': {
+            'base_usage': 15,  # RCU
+            'variation': 5,
+            'limit': 25,
+            'unit': 'RCU',
+            'cost_per_unit': 0.00013
         }
     }
+}
+
+# Flattened to one tuple per series, with the monthly limit pre-divided
+# into a daily one; weekly patterns (lower usage on weekends) only apply
+# to compute and database services
+_SERIES_CONFIG = tuple(
+    (service_name, usage_type, config['base_usage'], config['variation'],
+     config['limit'] / 30.0, config['unit'], config['cost_per_unit'],
+     'Compute' in service_name or 'Database' in service_name)
+    for service_name, usage_types in _SERVICES_CONFIG.items()
+    for usage_type, config in usage_types.items()
+)
+
+# Per-series parameters as columns, so a day's values for every series are
+# computed in one vectorized step
+_SERIES_COLUMNS = tuple(zip(*_SERIES_CONFIG))
+_SERIES_SERVICES = np.array(_SERIES_COLUMNS[0], dtype=object)
+_SERIES_USAGE_TYPES = np.array(_SERIES_COLUMNS[1], dtype=object)
+_SERIES_BASE = np.array(_SERIES_COLUMNS[2], dtype=float)
+_SERIES_VARIATION = np.array(_SERIES_COLUMNS[3], dtype=float)
+_SERIES_DAILY_LIMIT = np.array(_SERIES_COLUMNS[4], dtype=float)
+_SERIES_UNITS = np.array(_SERIES_COLUMNS[5], dtype=object)
+_SERIES_COST_PER_UNIT = np.array(_SERIES_COLUMNS[6], dtype=float)
+_SERIES_WEEKEND_SENSITIVE = np.array(_SERIES_COLUMNS[7], dtype=bool)
+
+
+def _generate_chunk(day_offsets: Sequence[int], end_date: date,
+                    day_seeds: Sequence[np.random.SeedSequence]) -> Dict[str, np.ndarray]:
+    """Generate sample columns for the given day offsets back from end_date."""
+    days = len(day_offsets)
+    num_series = len(_SERIES_CONFIG)
     
-    sample_data = []
-    end_date = datetime.now().date()
+    # Per-day values are computed once and shared by every series
+    dates = [end_date - timedelta(days=int(i)) for i in day_offsets]
+    date_strs = np.array([d.isoformat() for d in dates], dtype=object)
+    weekend = np.array([d.weekday() >= 5 for d in dates], dtype=bool)
     
-    for i in range(days):
-        current_date = end_date - timedelta(days=i)
-        date_str = current_date.strftime('%Y-%m-%d')
-        
-        for service_name, usage_types in services_config.items():
-            for usage_type, config in usage_types.items():
-                # Generate realistic usage with some randomness
-                base = config['base_usage']
-                variation = config['variation']
-                usage_amount = max(0, base + random.uniform(-variation, variation))
-                
-                # Add weekly patterns (lower usage on weekends for some services)
-                if current_date.weekday() in [5, 6]:  # Weekend
-                    if 'Compute' in service_name or 'Database' in service_name:
-                        usage_amount *= 0.7  # Reduce weekend usage
-                
-                # Calculate cost (0 if within free tier for the month)
-                monthly_usage = usage_amount * 30  # Rough monthly estimate
-                cost = 0.0
-                
-                if monthly_usage > config['limit']:
-                    excess_usage = usage_amount  # Simplified - in reality would need month-to-date tracking
-                    cost = excess_usage * config['cost_per_unit']
-                
-                # Add some random small costs to simulate edge cases
-                if random.random() < 0.05:  # 5% chance of small unexpected cost
-                    cost += random.uniform(0.01, 0.50)
-                
-                sample_data.append({
-                    'date': date_str,
-                    'service': service_name,
-                    'usage_type': usage_type,
-                    'usage_amount': round(usage_amount, 2),
-                    'usage_unit': config['unit'],
-                    'cost': round(cost, 4),
-                    'currency': 'USD'
-                })
+    # Each day draws from its own random stream, so a seed gives the same
+    # data however the days are split into chunks
+    noise = np.empty((days, num_series))
+    rare = np.empty((days, num_series))
+    surprise_cost = np.empty((days, num_series))
+    for row, day_seed in enumerate(day_seeds):
+        rng = np.random.default_rng(day_seed)
+        noise[row] = rng.uniform(-_SERIES_VARIATION, _SERIES_VARIATION)
+        rng.random(out=rare[row])
+        surprise_cost[row] = rng.uniform(0.01, 0.50, size=num_series)
+    
+    # The math below runs in place on preallocated (day, series) arrays
+    # (out=/where=) so no temporary array is allocated per operation
+    
+    # Generate realistic usage with some randomness
+    usage = np.add(noise, _SERIES_BASE, out=noise)
+    np.maximum(usage, 0, out=usage)
+    
+    # Add weekly patterns
+    np.multiply(usage, 0.7, out=usage,
+                where=weekend[:, None] & _SERIES_WEEKEND_SENSITIVE)  # Reduce weekend usage
+    
+    # Calculate cost (0 if within free tier for the month)
+    # Simplified - in reality would need month-to-date tracking
+    cost = np.zeros((days, num_series))
+    np.multiply(usage, _SERIES_COST_PER_UNIT, out=cost, where=usage > _SERIES_DAILY_LIMIT)
+    
+    # Add some random small costs to simulate edge cases
+    np.add(cost, surprise_cost, out=cost, where=rare < 0.05)  # 5% chance of small unexpected cost
+    
+    # Day-major columns: each day holds one row per series
+    sample_data = {
+        'date': np.repeat(date_strs, num_series),
+        'service': np.tile(_SERIES_SERVICES, days),
+        'usage_type': np.tile(_SERIES_USAGE_TYPES, days),
+        'usage_amount': usage.ravel(),
+        'usage_unit': np.tile(_SERIES_UNITS, days),
+        'cost': cost.ravel(),
+        'currency': np.full(days * num_series, 'USD', dtype=object)
+    }
     
     return sample_data
 
 
-def populate_sample_data(db_path: str = "data/finops_dashboard.db", days: int = 30):
-    """Populate database with sample data."""
+def _generate_chunk_args(args) -> Dict[str, np.ndarray]:
+    """Single-argument wrapper around _generate_chunk for Pool.imap."""
+    return _generate_chunk(*args)
+
+
+def iter_sample_aws_data(days: int = 30, seed: Optional[int] = None, workers: int = 1,
+                         chunk_days: int = 100) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Yield sample AWS usage data in column chunks, newest days first.
     
-    # Initialize database
-    db_manager = DatabaseManager(db_path)
-    db_manager.initialize_tables()
+    Args:
+        days: Number of days of data to generate
+        seed: Random seed for reproducible data, random if not given
+        workers: Number of processes to generate chunks with
+        chunk_days: Maximum number of days per chunk
+        
+    Yields:
+        Dicts of equal-length arrays covering at most chunk_days days each
+    """
+    end_date = datetime.now().date()
     
-    # Generate and insert sample data
-    logger.info(f"Generating {days} days of sample AWS usage data...")
-    sample_data = generate_sample_aws_data(days)
+    # Contiguous day chunks; every day has an independent random stream, so
+    # the seed alone pins the data whatever chunk_days and workers are
+    day_seeds = np.random.SeedSequence(seed).spawn(days)
+    chunks = [range(start, min(start + chunk_days, days))
+              for start in range(0, days, chunk_days)] or [range(0)]
+    chunk_args = zip(chunks, repeat(end_date), ([day_seeds[i] for i in chunk] for chunk in chunks))
     
-    logger.info(f"Inserting {len(sample_data)} sample records into database...")
-    db_manager.insert_usage_data(sample_data)
+    if workers <= 1 or len(chunks) < 2:
+        yield from map(_generate_chunk_args, chunk_args)
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            yield from pool.imap(_generate_chunk_args, chunk_args)
+
+
+def generate_sample_aws_data(days: int = 30, seed: Optional[int] = None,
+                             workers: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Generate sample AWS usage data as columns (one array per field).
     
-    # Generate some sample alerts
-    logger.info("Generating sample alerts...")
-    current_month = datetime.now().strftime('%Y-%m')
-    usage_status = db_manager.check_free_tier_usage(current_month)
+    Args:
+        days: Number of days of data to generate
+        seed: Random seed for reproducible data, random if not given
+        workers: Number of processes to split the day range across
+        
+    Returns:
+        Dict of equal-length arrays, newest day first
+    """
+    # One chunk per worker
+    chunk_days = max(1, -(-days // max(1, workers)))
+    parts = list(iter_sample_aws_data(days, seed, workers, chunk_days))
     
-    alerts_created = 0
-    for service_usage in usage_status:
-        if service_usage.get('usage_percentage', 0) >= 75:
-            db_manager.create_free_tier_alert(
-                service_usage['service'],
-                service_usage['usage_type'],
-                service_usage['total_usage'],
-                service_usage['free_tier_limit']
-            )
-            alerts_created += 1
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def populate_sample_data(db_path: str = "data/finops_dashboard.db", days: int = 30,
+                         seed: Optional[int] = None, workers: int = 1) -> int:
+    """
+    Populate database with sample data.
     
-    logger.info(f"Created {alerts_created} sample alerts")
+    Data is generated and inserted chunk by chunk, so memory use does not
+    grow with the number of days.
+    
+    Returns:
+        Number of usage records inserted
+    """
+    
+    # One connection is reused for the whole load
+    with DatabaseManager(db_path) as db_manager:
+        # Initialize database (indexes are built after the load below)
+        db_manager.create_tables()
+        
+        # Generate and insert sample data
+        logger.info(f"Generating and inserting {days} days of sample AWS usage data...")
+        record_count = 0
+        services = set()
+        
+        # Building the indexes once after the load is cheaper than per-row updates
+        db_manager.drop_secondary_indexes()
+        for chunk in iter_sample_aws_data(days, seed, workers):
+            record_count += db_manager.insert_usage_columns(chunk)
+            services.update(chunk['service'])
+        db_manager.create_secondary_indexes()
+        
+        # Generate some sample alerts
+        logger.info("Generating sample alerts...")
+        current_month = datetime.now().strftime('%Y-%m')
+        usage_status = db_manager.check_free_tier_usage(current_month, min_percentage=75)
+        
+        alerts_created = db_manager.create_free_tier_alerts(
+            (service_usage['service'], service_usage['usage_type'],
+             service_usage['total_usage'], service_usage['free_tier_limit'])
+            for service_usage in usage_status
+        )
+        
+        logger.info(f"Created {alerts_created} sample alerts")
     
     # Print summary
     logger.info("Sample data generation complete!")
     logger.info(f"- Database: {db_path}")
-    logger.info(f"- Records: {len(sample_data)}")
+    logger.info(f"- Records: {record_count}")
     logger.info(f"- Date range: {days} days")
-    logger.info(f"- Services: {len(set(r['service'] for r in sample_data))}")
+    logger.info(f"- Services: {len(services)}")
     
-    return sample_data
+    return record_count
 
 
 def generate_usage_scenarios():
@@ -226,6 +326,8 @@ if __name__ == "__main__":
     parser.add_argument('--days', type=int, default=30, help='Number of days of sample data')
     parser.add_argument('--db-path', default='data/finops_dashboard.db', help='Database path')
     parser.add_argument('--scenarios', action='store_true', help='Generate specific test scenarios')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+    parser.add_argument('--workers', type=int, default=1, help='Processes to generate data with')
     
     args = parser.parse_args()
     
@@ -233,7 +335,7 @@ if __name__ == "__main__":
     os.makedirs(os.path.dirname(args.db_path), exist_ok=True)
     
     # Generate sample data
-    sample_data = populate_sample_data(args.db_path, args.days)
+    populate_sample_data(args.db_path, args.days, args.seed, args.workers)
     
     if args.scenarios:
         logger.info("\nAvailable test scenarios:")
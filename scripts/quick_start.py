@@ -8,6 +8,7 @@ import os
 import sys
 import subprocess
 import shutil
+import importlib.util
 from pathlib import Path
 
 def print_banner():
@@ -20,19 +21,21 @@ def print_banner():
 
 def check_requirements():
     """Check if requirements are installed."""
-    try:
-        import boto3
-        import dash
-        import plotly
-        import yaml
+    # find_spec only locates the packages, so nothing heavy like boto3 is imported here
+    missing = [pkg for pkg in ('boto3', 'dash', 'plotly', 'yaml')
+               if importlib.util.find_spec(pkg) is None]
+    
+    if not missing:
         print("✅ All required packages are installed")
         return True
-    except ImportError as e:
-        print(f"❌ Missing required package: {e}")
+    else:
+        print(f"❌ Missing required packages: {', '.join(missing)}")
         print("Installing requirements...")
         try:
-            subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
-                          check=True, capture_output=True)
+            # Prefer prebuilt wheels over source builds, and let pip's progress
+            # show so a slow install doesn't look like a hang
+            subprocess.run([sys.executable, "-m", "pip", "install", "--prefer-binary",
+                            "-r", "requirements.txt"], check=True)
             print("✅ Requirements installed successfully")
             return True
         except subprocess.CalledProcessError:
@@ -80,6 +83,9 @@ def check_aws_credentials():
         
         try:
             session = boto3.Session()
+            # Resolving credentials is local, so skip the STS round-trip when there are none
+            if session.get_credentials() is None:
+                raise NoCredentialsError()
             sts = session.client('sts')
             identity = sts.get_caller_identity()
             print(f"✅ AWS credentials configured for account: {identity.get('Account', 'Unknown')}")
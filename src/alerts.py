@@ -2,10 +2,107 @@
 Alert manager for AWS Free Tier usage monitoring and breach detection.
 """
 
+import calendar
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
+from dataclasses import dataclass
 from datetime import datetime
-from database import DatabaseManager
+from database import DatabaseManager, month_range
+
+
+# Optimization advice for high-usage services, keyed by the tag from _classify
+RECOMMENDATION_RULES = {
+    'ec2_micro': {
+        'type': 'optimization',
+        'priority': 'high',
+        'title': 'EC2 t2.micro Usage Optimization',
+        'description': 'Consider stopping instances when not needed to stay within 750 hours/month limit',
+        'action': 'Schedule automatic stop/start or use spot instances'
+    },
+    's3': {
+        'type': 'optimization',
+        'priority': 'medium',
+        'title': 'S3 Storage Optimization',
+        'description': 'Review stored data and consider lifecycle policies',
+        'action': 'Delete unnecessary files or move to cheaper storage classes'
+    },
+    'lambda': {
+        'type': 'optimization',
+        'priority': 'medium',
+        'title': 'Lambda Usage Optimization',
+        'description': 'Optimize function memory allocation and execution time',
+        'action': 'Review function performance and reduce memory/duration if possible'
+    }
+}
+
+# Alert message templates by severity
+_SEVERITY_TEMPLATES = {
+    'warning': "⚠️  WARNING: {service} ({usage_type}) is at {usage_percentage:.1f}% of free tier limit",
+    'critical': "🚨 CRITICAL: {service} ({usage_type}) is at {usage_percentage:.1f}% of free tier limit - charges may apply soon!",
+    'breach': "💰 BREACH: {service} ({usage_type}) has exceeded free tier limit - charges are being incurred!"
+}
+
+# Recommendations made regardless of usage
+ALWAYS_ON_RECOMMENDATIONS = (
+    {
+        'id': 'budgets',
+        'service': 'General',
+        'type': 'monitoring',
+        'priority': 'high',
+        'title': 'Set up AWS Budgets',
+        'description': 'Create zero-spend budget to get alerts before charges occur',
+        'action': 'Go to AWS Budgets console and create a $0.01 budget with email alerts'
+    },
+    {
+        'id': 'anomaly_detection',
+        'service': 'General',
+        'type': 'security',
+        'priority': 'high',
+        'title': 'Enable Cost Anomaly Detection',
+        'description': 'AWS service to detect unusual spending patterns',
+        'action': 'Enable in AWS Cost Management console (free service)'
+    }
+)
+
+
+# Exact Cost Explorer service names (see Config.get_aws_free_tier_services)
+_SERVICE_TAG = {
+    'Amazon Elastic Compute Cloud - Compute': 'ec2',
+    'Amazon Simple Storage Service': 's3',
+    'AWS Lambda': 'lambda'
+}
+
+
+def _classify(service: str, usage_type: str) -> Optional[str]:
+    """Map a service/usage type to its RECOMMENDATION_RULES tag, if any."""
+    tag = _SERVICE_TAG.get(service)
+    if tag == 'ec2':
+        return 'ec2_micro' if 't2.micro' in usage_type else None
+    return tag
+
+
+@dataclass
+class Alert:
+    """A free tier usage alert."""
+    
+    # Declared by hand (not dataclass(slots=True)) to keep Python 3.8 support
+    __slots__ = ('service', 'usage_type', 'severity', 'usage_percentage', 'current_usage',
+                 'limit', 'remaining', 'message', 'timestamp', 'month')
+    
+    service: str
+    usage_type: str
+    severity: str
+    usage_percentage: float
+    current_usage: float
+    limit: float
+    remaining: float
+    message: str
+    timestamp: str
+    month: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict, e.g. for JSON output."""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class FreeTierAlertManager:
@@ -24,86 +121,87 @@ class FreeTierAlertManager:
             'breach': 100.0     # Over limit (incurring charges)
         }
     
-    def check_free_tier_alerts(self, usage_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def iter_free_tier_alerts(self) -> Iterator[Alert]:
         """
-        Check usage data against free tier limits and generate alerts.
+        Yield the current month's free tier alerts, without storing them.
         
-        Args:
-            usage_data: List of usage records from AWS
-            
-        Returns:
-            List of alerts generated
+        Alerts are built one at a time as they are consumed, so a
+        did-anything-trigger check like any(...) stops at the first one.
+        Use check_free_tier_alerts to also store and log them.
+        
+        Yields:
+            Alerts for services at or above the warning threshold
         """
-        alerts = []
-        current_month = datetime.now().strftime('%Y-%m')
+        now = datetime.now()
+        timestamp = now.isoformat()
+        current_month = now.strftime('%Y-%m')
+        critical_threshold = self.alert_thresholds['critical']
         
-        # Get current month's usage status
-        usage_status = self.db_manager.check_free_tier_usage(current_month)
+        # Get current month's usage status; services without a limit or below
+        # the warning threshold are filtered out in SQL, so every row alerts
+        usage_status = self.db_manager.check_free_tier_usage(
+            current_month, min_percentage=self.alert_thresholds['warning']
+        )
         
         for service_usage in usage_status:
-            if service_usage.get('free_tier_limit'):
-                usage_percentage = service_usage.get('usage_percentage', 0)
-                
-                # Check for alerts
-                if usage_percentage >= self.alert_thresholds['critical']:
-                    alert = self._create_alert(
-                        service_usage['service'],
-                        service_usage['usage_type'],
-                        'critical',
-                        usage_percentage,
-                        service_usage['total_usage'],
-                        service_usage['free_tier_limit']
-                    )
-                    alerts.append(alert)
-                    
-                elif usage_percentage >= self.alert_thresholds['warning']:
-                    alert = self._create_alert(
-                        service_usage['service'],
-                        service_usage['usage_type'],
-                        'warning',
-                        usage_percentage,
-                        service_usage['total_usage'],
-                        service_usage['free_tier_limit']
-                    )
-                    alerts.append(alert)
+            yield self._build_alert(
+                service_usage['service'],
+                service_usage['usage_type'],
+                'critical' if service_usage['usage_percentage'] >= critical_threshold else 'warning',
+                service_usage['usage_percentage'],
+                service_usage['total_usage'],
+                service_usage['free_tier_limit'],
+                timestamp,
+                current_month
+            )
+    
+    def check_free_tier_alerts(self) -> List[Alert]:
+        """
+        Check stored usage against free tier limits, then store and log the alerts.
+        
+        The records must already be stored (see DatabaseManager.insert_cost_data);
+        usage percentages come from one SQL aggregation over the month rather
+        than a per-record loop here. Call it once after all of a run's
+        records are stored, since every call stores the alerts it finds.
+        
+        Returns:
+            List of alerts generated
+        """
+        alerts = list(self.iter_free_tier_alerts())
+        
+        # Store all alerts in database in one transaction
+        self.db_manager.create_free_tier_alerts(
+            (alert.service, alert.usage_type, alert.current_usage, alert.limit)
+            for alert in alerts
+        )
         
         # Log alerts
         if alerts:
             self.logger.warning(f"Generated {len(alerts)} free tier alerts")
             for alert in alerts:
-                self.logger.warning(f"Alert: {alert['message']}")
+                self.logger.warning(f"Alert: {alert.message}")
         
         return alerts
     
-    def _create_alert(self, service: str, usage_type: str, severity: str,
+    def _build_alert(self, service: str, usage_type: str, severity: str,
                      usage_percentage: float, current_usage: float, 
-                     limit: float) -> Dict[str, Any]:
-        """Create an alert record."""
-        messages = {
-            'warning': f"⚠️  WARNING: {service} ({usage_type}) is at {usage_percentage:.1f}% of free tier limit",
-            'critical': f"🚨 CRITICAL: {service} ({usage_type}) is at {usage_percentage:.1f}% of free tier limit - charges may apply soon!",
-            'breach': f"💰 BREACH: {service} ({usage_type}) has exceeded free tier limit - charges are being incurred!"
-        }
+                     limit: float, timestamp: str, month: str) -> Alert:
+        """Build an alert record (storing it is left to the caller)."""
+        template = _SEVERITY_TEMPLATES.get(severity, "Alert for {service}")
         
-        alert = {
-            'service': service,
-            'usage_type': usage_type,
-            'severity': severity,
-            'usage_percentage': usage_percentage,
-            'current_usage': current_usage,
-            'limit': limit,
-            'remaining': max(0, limit - current_usage),
-            'message': messages.get(severity, f"Alert for {service}"),
-            'timestamp': datetime.now().isoformat(),
-            'month': datetime.now().strftime('%Y-%m')
-        }
-        
-        # Store alert in database
-        self.db_manager.create_free_tier_alert(
-            service, usage_type, current_usage, limit
+        return Alert(
+            service=service,
+            usage_type=usage_type,
+            severity=severity,
+            usage_percentage=usage_percentage,
+            current_usage=current_usage,
+            limit=limit,
+            remaining=max(0, limit - current_usage),
+            message=template.format(service=service, usage_type=usage_type,
+                                    usage_percentage=usage_percentage),
+            timestamp=timestamp,
+            month=month
         )
-        
-        return alert
     
     def get_service_recommendations(self, usage_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -113,101 +211,59 @@ class FreeTierAlertManager:
             usage_data: Current usage data
             
         Returns:
-            List of optimization recommendations
+            List of optimization recommendations; each has a stable 'id' (the
+            RECOMMENDATION_RULES key, or 'budgets' / 'anomaly_detection') to
+            index them by
         """
         recommendations = []
         current_month = datetime.now().strftime('%Y-%m')
         usage_status = self.db_manager.check_free_tier_usage(current_month)
         
         for service_usage in usage_status:
-            service = service_usage['service']
-            usage_type = service_usage['usage_type']
             usage_percentage = service_usage.get('usage_percentage', 0)
             
             if usage_percentage >= 80:  # High usage services
-                if 'Elastic Compute Cloud' in service and 't2.micro' in usage_type:
-                    recommendations.append({
-                        'service': service,
-                        'type': 'optimization',
-                        'priority': 'high',
-                        'title': 'EC2 t2.micro Usage Optimization',
-                        'description': 'Consider stopping instances when not needed to stay within 750 hours/month limit',
-                        'action': 'Schedule automatic stop/start or use spot instances'
-                    })
-                
-                elif 'Simple Storage Service' in service:
-                    recommendations.append({
-                        'service': service,
-                        'type': 'optimization',
-                        'priority': 'medium',
-                        'title': 'S3 Storage Optimization',
-                        'description': 'Review stored data and consider lifecycle policies',
-                        'action': 'Delete unnecessary files or move to cheaper storage classes'
-                    })
-                
-                elif 'Lambda' in service:
-                    recommendations.append({
-                        'service': service,
-                        'type': 'optimization',
-                        'priority': 'medium',
-                        'title': 'Lambda Usage Optimization',
-                        'description': 'Optimize function memory allocation and execution time',
-                        'action': 'Review function performance and reduce memory/duration if possible'
-                    })
-        
-        # Always-on recommendations
-        recommendations.extend([
-            {
-                'service': 'General',
-                'type': 'monitoring',
-                'priority': 'high',
-                'title': 'Set up AWS Budgets',
-                'description': 'Create zero-spend budget to get alerts before charges occur',
-                'action': 'Go to AWS Budgets console and create a $0.01 budget with email alerts'
-            },
-            {
-                'service': 'General',
-                'type': 'security',
-                'priority': 'high',
-                'title': 'Enable Cost Anomaly Detection',
-                'description': 'AWS service to detect unusual spending patterns',
-                'action': 'Enable in AWS Cost Management console (free service)'
-            }
-        ])
+                rule_id = _classify(service_usage['service'], service_usage['usage_type'])
+                rule = RECOMMENDATION_RULES.get(rule_id)
+                if rule:
+                    recommendations.append({'id': rule_id, 'service': service_usage['service'], **rule})
+        
+        # Always-on recommendations (copied, so callers can't alter the constants)
+        recommendations.extend(dict(rec) for rec in ALWAYS_ON_RECOMMENDATIONS)
         
         return recommendations
     
     def generate_weekly_alert_summary(self) -> Dict[str, Any]:
         """Generate a summary of alerts from the past week."""
         with self.db_manager.get_connection() as conn:
+            # One scan of the window, grouped by both keys and folded below
             cursor = conn.execute('''
                 SELECT 
+                    date,
                     alert_level,
                     COUNT(*) as alert_count,
                     GROUP_CONCAT(DISTINCT service) as affected_services
                 FROM free_tier_alerts 
                 WHERE date >= date('now', '-7 days')
-                GROUP BY alert_level
-            ''')
-            
-            alerts_by_level = {row['alert_level']: {
-                'count': row['alert_count'],
-                'services': row['affected_services'].split(',') if row['affected_services'] else []
-            } for row in cursor.fetchall()}
-            
-            # Get trend information
-            cursor = conn.execute('''
-                SELECT 
-                    date,
-                    COUNT(*) as daily_alerts
-                FROM free_tier_alerts 
-                WHERE date >= date('now', '-7 days')
-                GROUP BY date
+                GROUP BY date, alert_level
                 ORDER BY date
             ''')
+            rows = cursor.fetchall()
+        
+        alerts_by_level = {}
+        daily_alerts = {}
+        for row in rows:
+            level = alerts_by_level.setdefault(row['alert_level'], {'count': 0, 'services': []})
+            level['count'] += row['alert_count']
+            if row['affected_services']:
+                for service in row['affected_services'].split(','):
+                    if service not in level['services']:
+                        level['services'].append(service)
             
-            daily_trend = [{'date': row['date'], 'alerts': row['daily_alerts']} 
-                          for row in cursor.fetchall()]
+            daily_alerts[row['date']] = daily_alerts.get(row['date'], 0) + row['alert_count']
+        
+        daily_trend = [{'date': alert_date, 'alerts': count}
+                      for alert_date, count in daily_alerts.items()]
         
         return {
             'period': 'Last 7 days',
@@ -227,25 +283,25 @@ class FreeTierAlertManager:
         Returns:
             List of cost anomaly alerts
         """
-        anomalies = []
-        
-        # Simple anomaly detection: any non-zero cost is suspicious for free tier
-        for record in cost_data:
-            cost = record.get('cost', 0.0)
-            if cost > 0.01:  # More than 1 cent
-                anomaly = {
-                    'type': 'cost_anomaly',
-                    'date': record.get('date'),
-                    'service': record.get('service'),
-                    'usage_type': record.get('usage_type'),
-                    'cost': cost,
-                    'currency': record.get('currency', 'USD'),
-                    'message': f"Unexpected cost of ${cost:.2f} detected for {record.get('service')} - free tier may be exceeded",
-                    'severity': 'critical' if cost > 1.0 else 'warning'
-                }
-                anomalies.append(anomaly)
-        
-        return anomalies
+        # Simple anomaly detection: any non-zero cost is suspicious for free tier.
+        # Almost all free tier rows cost nothing, so filter on cost first and
+        # only build anomaly dicts for the few rows left
+        costly = [record for record in cost_data
+                  if record.get('cost', 0.0) > 0.01]  # More than 1 cent
+        
+        return [
+            {
+                'type': 'cost_anomaly',
+                'date': record.get('date'),
+                'service': record.get('service'),
+                'usage_type': record.get('usage_type'),
+                'cost': record['cost'],
+                'currency': record.get('currency', 'USD'),
+                'message': f"Unexpected cost of ${record['cost']:.2f} detected for {record.get('service')} - free tier may be exceeded",
+                'severity': 'critical' if record['cost'] > 1.0 else 'warning'
+            }
+            for record in costly
+        ]
     
     def predict_free_tier_breach(self, service: str, usage_type: str) -> Optional[Dict[str, Any]]:
         """
@@ -258,49 +314,94 @@ class FreeTierAlertManager:
         Returns:
             Prediction data or None if insufficient data
         """
-        current_month = datetime.now().strftime('%Y-%m')
-        current_day = datetime.now().day
-        days_in_month = 31  # Conservative estimate
+        now = datetime.now()
+        current_month = now.strftime('%Y-%m')
         
         with self.db_manager.get_connection() as conn:
             cursor = conn.execute('''
                 SELECT 
-                    SUM(usage_amount) as month_to_date_usage,
-                    free_tier_limit,
-                    usage_unit
-                FROM aws_free_tier_usage 
-                WHERE service = ? AND usage_type = ? 
-                AND strftime('%Y-%m', date) = ?
-                GROUP BY service, usage_type
-            ''', (service, usage_type, current_month))
+                    u.service,
+                    u.usage_type,
+                    SUM(u.usage_amount) as month_to_date_usage,
+                    l.monthly_limit as free_tier_limit,
+                    u.usage_unit
+                FROM aws_free_tier_usage u
+                LEFT JOIN free_tier_limits l
+                    ON l.service = u.service AND l.usage_type = u.usage_type
+                WHERE u.service = ? AND u.usage_type = ? 
+                AND u.date >= ? AND u.date < ?
+                GROUP BY u.service, u.usage_type
+            ''', (service, usage_type, *month_range(current_month)))
             
             row = cursor.fetchone()
-            if not row or not row['free_tier_limit']:
-                return None
-            
-            month_to_date = row['month_to_date_usage']
-            limit = row['free_tier_limit']
-            unit = row['usage_unit']
+        
+        if not row:
+            return None
+        
+        return self._project_breach(row, now)
+    
+    def predict_free_tier_breach_all(self) -> List[Dict[str, Any]]:
+        """
+        Predict free tier breaches for every tracked service in one query.
+        
+        Returns:
+            Prediction data for each service projected to exceed its limit
+        """
+        now = datetime.now()
+        current_month = now.strftime('%Y-%m')
+        
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.execute('''
+                SELECT 
+                    u.service,
+                    u.usage_type,
+                    SUM(u.usage_amount) as month_to_date_usage,
+                    l.monthly_limit as free_tier_limit,
+                    u.usage_unit
+                FROM aws_free_tier_usage u
+                LEFT JOIN free_tier_limits l
+                    ON l.service = u.service AND l.usage_type = u.usage_type
+                WHERE u.date >= ? AND u.date < ?
+                GROUP BY u.service, u.usage_type
+                ORDER BY u.service, u.usage_type
+            ''', month_range(current_month))
             
-            # Calculate daily average and project to end of month
-            daily_average = month_to_date / current_day
-            projected_monthly_usage = daily_average * days_in_month
+            rows = cursor.fetchall()
+        
+        predictions = (self._project_breach(row, now) for row in rows)
+        return [prediction for prediction in predictions if prediction]
+    
+    def _project_breach(self, row, now: datetime) -> Optional[Dict[str, Any]]:
+        """Project a month-to-date usage row to the end of the month."""
+        if not row['free_tier_limit']:
+            return None
+        
+        current_day = now.day
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        
+        month_to_date = row['month_to_date_usage']
+        limit = row['free_tier_limit']
+        unit = row['usage_unit']
+        
+        # Calculate daily average and project to end of month
+        daily_average = month_to_date / current_day
+        projected_monthly_usage = daily_average * days_in_month
+        
+        if projected_monthly_usage > limit:
+            days_to_breach = max(1, int((limit - month_to_date) / daily_average))
+            breach_date = now.replace(day=min(days_in_month, current_day + days_to_breach))
             
-            if projected_monthly_usage > limit:
-                days_to_breach = max(1, int((limit - month_to_date) / daily_average))
-                breach_date = datetime.now().replace(day=min(days_in_month, current_day + days_to_breach))
-                
-                return {
-                    'service': service,
-                    'usage_type': usage_type,
-                    'current_usage': month_to_date,
-                    'projected_usage': projected_monthly_usage,
-                    'limit': limit,
-                    'unit': unit,
-                    'daily_average': daily_average,
-                    'days_to_breach': days_to_breach,
-                    'projected_breach_date': breach_date.strftime('%Y-%m-%d'),
-                    'confidence': 'medium' if current_day >= 7 else 'low'
-                }
+            return {
+                'service': row['service'],
+                'usage_type': row['usage_type'],
+                'current_usage': month_to_date,
+                'projected_usage': projected_monthly_usage,
+                'limit': limit,
+                'unit': unit,
+                'daily_average': daily_average,
+                'days_to_breach': days_to_breach,
+                'projected_breach_date': breach_date.strftime('%Y-%m-%d'),
+                'confidence': 'medium' if current_day >= 7 else 'low'
+            }
         
         return None
@@ -4,11 +4,53 @@ AWS Cost Explorer API client for fetching cloud cost and usage data.
 
 import boto3
 import logging
-from datetime import datetime, date
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from itertools import chain
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from botocore.exceptions import ClientError, NoCredentialsError
 
 
+# Services whose usage is reported by get_free_tier_usage
+FREE_TIER_SERVICES = frozenset({
+    'Amazon Elastic Compute Cloud - Compute',
+    'Amazon Simple Storage Service',
+    'Amazon Relational Database Service',
+    'AWS Lambda',
+    'Amazon CloudWatch'
+})
+
+# boto3 clients keyed by (service, profile, region), shared across instances
+_CLIENT_CACHE: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+
+
+def get_cached_client(service_name: str, profile: Optional[str] = None,
+                      region: Optional[str] = None):
+    """
+    Get a boto3 client, creating it only on first use.
+    
+    Building a client resolves credentials and endpoints, so repeated
+    callers (e.g. a polling loop creating AWSCostClient) reuse one instead.
+    """
+    key = (service_name, profile, region)
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        client = _CLIENT_CACHE.setdefault(key, session.client(service_name, region_name=region))
+    return client
+
+
+def invalidate_cached_client(service_name: str, profile: Optional[str] = None,
+                             region: Optional[str] = None) -> None:
+    """
+    Forget a cached boto3 client, so the next get_cached_client builds a new one.
+    
+    Call it when a client's credentials were missing, rejected or expired;
+    a new session resolves credentials again instead of reusing the old ones.
+    """
+    _CLIENT_CACHE.pop((service_name, profile, region), None)
+
+
 class AWSCostClient:
     """Client for interacting with AWS Cost Explorer API."""
     
@@ -18,70 +60,158 @@ class AWSCostClient:
         self.logger = logging.getLogger(__name__)
         
         try:
-            # Initialize boto3 client
-            if config.aws_profile:
-                session = boto3.Session(profile_name=config.aws_profile)
-                self.cost_client = session.client('ce', region_name=config.aws_region)
-            else:
-                self.cost_client = boto3.client('ce', region_name=config.aws_region)
+            # Initialize boto3 client (cached per profile and region)
+            self.cost_client = get_cached_client('ce', config.aws_profile, config.aws_region)
                 
         except NoCredentialsError:
             self.logger.error("AWS credentials not found. Please configure AWS credentials.")
             raise
     
-    def get_cost_and_usage(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+    def _drop_cached_client(self) -> None:
+        """Stop sharing this client's boto3 client after a credentials or API error."""
+        # e.g. expired credentials; later AWSCostClients get a fresh client
+        invalidate_cached_client('ce', self.config.aws_profile, self.config.aws_region)
+    
+    def iter_cost_and_usage_pages(self, start_date: date,
+                                  end_date: date) -> Iterator[List[Dict[str, Any]]]:
         """
-        Fetch cost and usage data from AWS Cost Explorer.
+        Stream cost and usage records from AWS Cost Explorer, a page at a time.
+        
+        Every result page is followed (Cost Explorer splits wide windows via
+        NextPageToken) and each page's records are yielded as it arrives.
         
         Args:
             start_date: Start date for cost data
             end_date: End date for cost data
             
-        Returns:
-            List of cost and usage records
+        Yields:
+            One list of cost and usage records per result page
         """
+        request = {
+            'TimePeriod': {
+                'Start': start_date.strftime('%Y-%m-%d'),
+                'End': end_date.strftime('%Y-%m-%d')
+            },
+            'Granularity': 'DAILY',
+            'Metrics': ['BlendedCost', 'UsageQuantity'],
+            'GroupBy': [
+                {'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                {'Type': 'DIMENSION', 'Key': 'USAGE_TYPE'}
+            ]
+        }
+        
         try:
-            response = self.cost_client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='DAILY',
-                Metrics=['BlendedCost', 'UsageQuantity'],
-                GroupBy=[
-                    {'Type': 'DIMENSION', 'Key': 'SERVICE'},
-                    {'Type': 'DIMENSION', 'Key': 'USAGE_TYPE'}
-                ]
-            )
-            
-            cost_data = []
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service = group['Keys'][0] if group['Keys'] else 'Unknown'
-                    usage_type = group['Keys'][1] if len(group['Keys']) > 1 else 'Unknown'
-                    
-                    blended_cost = float(group['Metrics']['BlendedCost']['Amount'])
-                    usage_quantity = float(group['Metrics']['UsageQuantity']['Amount'])
-                    
-                    cost_data.append({
-                        'date': result['TimePeriod']['Start'],
-                        'service': service,
-                        'usage_type': usage_type,
-                        'cost': blended_cost,
-                        'usage_quantity': usage_quantity,
-                        'currency': group['Metrics']['BlendedCost']['Unit']
-                    })
-            
-            self.logger.info(f"Retrieved {len(cost_data)} AWS cost records")
-            return cost_data
+            while True:
+                response = self.cost_client.get_cost_and_usage(**request)
+                
+                page = []
+                for result in response.get('ResultsByTime', []):
+                    for group in result.get('Groups', []):
+                        service = group['Keys'][0] if group['Keys'] else 'Unknown'
+                        usage_type = group['Keys'][1] if len(group['Keys']) > 1 else 'Unknown'
+                        
+                        blended_cost = float(group['Metrics']['BlendedCost']['Amount'])
+                        usage_quantity = float(group['Metrics']['UsageQuantity']['Amount'])
+                        
+                        page.append({
+                            'date': result['TimePeriod']['Start'],
+                            'service': service,
+                            'usage_type': usage_type,
+                            'cost': blended_cost,
+                            'usage_quantity': usage_quantity,
+                            'currency': group['Metrics']['BlendedCost']['Unit']
+                        })
+                yield page
+                
+                next_page_token = response.get('NextPageToken')
+                if not next_page_token:
+                    break
+                request['NextPageToken'] = next_page_token
             
-        except ClientError as e:
+        except (ClientError, NoCredentialsError) as e:
             self.logger.error(f"AWS API error: {e}")
+            self._drop_cached_client()
             raise
         except Exception as e:
             self.logger.error(f"Unexpected error fetching AWS cost data: {e}")
             raise
     
+    def iter_cost_and_usage(self, start_date: date, end_date: date) -> Iterator[Dict[str, Any]]:
+        """
+        Stream cost and usage records from AWS Cost Explorer.
+        
+        Args:
+            start_date: Start date for cost data
+            end_date: End date for cost data
+            
+        Returns:
+            Iterator of cost and usage records, fed as each result page arrives
+        """
+        return chain.from_iterable(self.iter_cost_and_usage_pages(start_date, end_date))
+    
+    def get_cost_and_usage(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """
+        Fetch cost and usage data from AWS Cost Explorer.
+        
+        Args:
+            start_date: Start date for cost data
+            end_date: End date for cost data
+            
+        Returns:
+            List of cost and usage records
+        """
+        cost_data = list(self.iter_cost_and_usage(start_date, end_date))
+        self.logger.info(f"Retrieved {len(cost_data)} AWS cost records")
+        return cost_data
+    
+    def iter_cost_and_usage_parallel(self, start_date: date, end_date: date,
+                                     max_workers: int = 8) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream cost and usage data as per-day chunks, fetched concurrently.
+        
+        Each day is an independent Cost Explorer request (boto3 clients are
+        thread safe), so the fetch takes about as long as the slowest day
+        rather than the whole window's pages in sequence. Cost Explorer bills
+        every request, so this makes one billed call per day; main() only
+        uses it when the aws_parallel_requests setting is on.
+        
+        Args:
+            start_date: Start date for cost data
+            end_date: End date for cost data (exclusive, as for get_cost_and_usage)
+            max_workers: Maximum number of concurrent requests
+            
+        Yields:
+            One list of cost and usage records per day, in date order
+        """
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days)]
+        if not days:
+            return
+        
+        # map yields the per-day results in date order as they become ready
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(days))) as executor:
+            yield from executor.map(
+                lambda day: list(self.iter_cost_and_usage(day, day + timedelta(days=1))), days
+            )
+    
+    def get_cost_and_usage_parallel(self, start_date: date, end_date: date,
+                                    max_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        Fetch cost and usage data with one concurrent request per day.
+        
+        Args:
+            start_date: Start date for cost data
+            end_date: End date for cost data (exclusive, as for get_cost_and_usage)
+            max_workers: Maximum number of concurrent requests
+            
+        Returns:
+            List of cost and usage records, in date order
+        """
+        cost_data = list(chain.from_iterable(
+            self.iter_cost_and_usage_parallel(start_date, end_date, max_workers)
+        ))
+        self.logger.info(f"Retrieved {len(cost_data)} AWS cost records")
+        return cost_data
+    
     def get_service_usage_forecast(self, service: str, days: int = 30) -> Optional[Dict[str, Any]]:
         """
         Get usage forecast for a specific AWS service.
@@ -159,21 +289,13 @@ class AWSCostClient:
                 }
             )
             
-            free_tier_services = [
-                'Amazon Elastic Compute Cloud - Compute',
-                'Amazon Simple Storage Service',
-                'Amazon Relational Database Service',
-                'AWS Lambda',
-                'Amazon CloudWatch'
-            ]
-            
             usage_data = []
             for result in response.get('ResultsByTime', []):
                 for group in result.get('Groups', []):
                     service = group['Keys'][0] if group['Keys'] else 'Unknown'
                     usage_type = group['Keys'][1] if len(group['Keys']) > 1 else 'Unknown'
                     
-                    if service in free_tier_services:
+                    if service in FREE_TIER_SERVICES:
                         usage_quantity = float(group['Metrics']['UsageQuantity']['Amount'])
                         
                         usage_data.append({
@@ -185,8 +307,9 @@ class AWSCostClient:
             
             return usage_data
             
-        except ClientError as e:
+        except (ClientError, NoCredentialsError) as e:
             self.logger.error(f"Error fetching free tier usage: {e}")
+            self._drop_cached_client()
             raise
         except Exception as e:
             self.logger.error(f"Unexpected error fetching free tier usage: {e}")
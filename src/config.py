@@ -3,12 +3,117 @@ Configuration management for Free Tier FinOps Dashboard.
 """
 
 import os
+import copy
 import yaml
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 
+# libyaml's C loader and dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+# Parsed config files by path, as (mtime_ns, parsed dict)
+_CONFIG_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+def _load_yaml_file(path: str) -> Dict[str, Any]:
+    """Parse a YAML config file, reusing the last parse while it is unchanged."""
+    path = os.path.abspath(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    
+    cached = _CONFIG_CACHE.get(path)
+    if cached is None or cached[0] != mtime_ns:
+        with open(path, 'r') as f:
+            parsed = yaml.load(f, Loader=_YamlLoader) or {}
+        cached = _CONFIG_CACHE[path] = (mtime_ns, parsed)
+    
+    # Callers merge and modify the result, so hand out a copy
+    return copy.deepcopy(cached[1])
+
+
+# Default configuration values
+_DEFAULTS = {
+    'database_path': 'data/finops_dashboard.db',
+    'aws_region': 'us-east-1',
+    'aws_profile': None,
+    'aws_enabled': True,
+    'aws_parallel_requests': False,  # One billed Cost Explorer request per day
+    'gcp_enabled': False,
+    'alert_thresholds': {
+        'warning': 75.0,
+        'critical': 90.0
+    },
+    'monitoring': {
+        'check_interval_hours': 6,
+        'report_email': None,
+        'enable_cost_alerts': True
+    },
+    'free_tier_focus': True,
+    'max_monthly_cost_alert': 1.0  # Alert if monthly cost exceeds $1
+}
+
+# AWS Free Tier service definitions with limits
+_FREE_TIER_SERVICES = {
+    'ec2': {
+        'name': 'Amazon Elastic Compute Cloud - Compute',
+        'limits': {
+            't2.micro': {'value': 750, 'unit': 'hours', 'period': 'monthly'}
+        },
+        'description': 'Free t2.micro instance for 750 hours per month'
+    },
+    's3': {
+        'name': 'Amazon Simple Storage Service',
+        'limits': {
+            'Standard Storage': {'value': 5, 'unit': 'GB', 'period': 'monthly'},
+            'GET Requests': {'value': 20000, 'unit': 'requests', 'period': 'monthly'},
+            'PUT Requests': {'value': 2000, 'unit': 'requests', 'period': 'monthly'}
+        },
+        'description': '5 GB storage, 20K GET requests, 2K PUT requests per month'
+    },
+    'lambda': {
+        'name': 'AWS Lambda',
+        'limits': {
+            'Requests': {'value': 1000000, 'unit': 'requests', 'period': 'monthly'},
+            'Duration': {'value': 400000, 'unit': 'GB-seconds', 'period': 'monthly'}
+        },
+        'description': '1M free requests and 400K GB-seconds per month'
+    },
+    'rds': {
+        'name': 'Amazon Relational Database Service',
+        'limits': {
+            'db.t2.micro': {'value': 750, 'unit': 'hours', 'period': 'monthly'},
+            'Storage': {'value': 20, 'unit': 'GB', 'period': 'monthly'}
+        },
+        'description': 'db.t2.micro for 750 hours and 20 GB storage per month'
+    },
+    'dynamodb': {
+        'name': 'Amazon DynamoDB',
+        'limits': {
+            'Storage': {'value': 25, 'unit': 'GB', 'period': 'monthly'},
+            'Read Capacity': {'value': 25, 'unit': 'RCU', 'period': 'monthly'},
+            'Write Capacity': {'value': 25, 'unit': 'WCU', 'period': 'monthly'}
+        },
+        'description': '25 GB storage, 25 RCU, 25 WCU per month'
+    }
+}
+
+
+def _flatten(config: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """Index every section and value of a nested config by its dotted key."""
+    flat = {}
+    for key, value in config.items():
+        if not isinstance(key, str):
+            continue
+        flat[prefix + key] = value
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+    return flat
+
+
 class Config:
     """Configuration manager for the FinOps Dashboard."""
     
@@ -17,39 +122,23 @@ class Config:
         self.config_file = config_file
         self.logger = logging.getLogger(__name__)
         
-        # Default configuration values
-        self.defaults = {
-            'database_path': 'data/finops_dashboard.db',
-            'aws_region': 'us-east-1',
-            'aws_profile': None,
-            'aws_enabled': True,
-            'gcp_enabled': False,
-            'alert_thresholds': {
-                'warning': 75.0,
-                'critical': 90.0
-            },
-            'monitoring': {
-                'check_interval_hours': 6,
-                'report_email': None,
-                'enable_cost_alerts': True
-            },
-            'free_tier_focus': True,
-            'max_monthly_cost_alert': 1.0  # Alert if monthly cost exceeds $1
-        }
+        # Default configuration values (a copy, so changing them can't leak
+        # into other instances)
+        self.defaults = copy.deepcopy(_DEFAULTS)
         
         # Load configuration
         self._config = self.load_config()
+        self._flat = _flatten(self._config)
     
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file or environment variables."""
-        config = self.defaults.copy()
+        # Deep copy, since set() writes into nested dicts like 'monitoring'
+        config = copy.deepcopy(_DEFAULTS)
         
         # Try to load from YAML file
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r') as f:
-                    file_config = yaml.safe_load(f) or {}
-                    config.update(file_config)
+                config.update(_load_yaml_file(self.config_file))
                 self.logger.info(f"Configuration loaded from {self.config_file}")
             except Exception as e:
                 self.logger.warning(f"Could not load config file {self.config_file}: {e}")
@@ -92,24 +181,23 @@ class Config:
             # Ensure config directory exists
             Path(self.config_file).parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.config_file, 'w') as f:
-                yaml.dump(self._config, f, default_flow_style=False, indent=2)
+            # Write beside the target and swap it in, so a reader polling the
+            # file never sees it half written
+            tmp_file = f"{self.config_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                yaml.dump(self._config, f, Dumper=_YamlDumper, default_flow_style=False,
+                          indent=2, sort_keys=False)
+            os.replace(tmp_file, self.config_file)
+            # Coarse filesystem mtimes could otherwise keep the old parse cached
+            _CONFIG_CACHE.pop(os.path.abspath(self.config_file), None)
             
             self.logger.info(f"Configuration saved to {self.config_file}")
         except Exception as e:
             self.logger.error(f"Could not save config to {self.config_file}: {e}")
     
     def get(self, key: str, default=None):
-        """Get configuration value."""
-        keys = key.split('.')
-        value = self._config
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        """Get configuration value (dotted keys reach into nested sections)."""
+        return self._flat.get(key, default)
     
     def set(self, key: str, value):
         """Set configuration value."""
@@ -124,6 +212,9 @@ class Config:
         
         # Set the value
         config_dict[keys[-1]] = value
+        
+        # Rebuild the dotted-key index, since value may replace a whole section
+        self._flat = _flatten(self._config)
     
     # Convenient property accessors
     @property
@@ -142,6 +233,10 @@ class Config:
     def aws_enabled(self) -> bool:
         return self.get('aws_enabled', True)
     
+    @property
+    def aws_parallel_requests(self) -> bool:
+        return self.get('aws_parallel_requests', False)
+    
     @property
     def gcp_enabled(self) -> bool:
         return self.get('gcp_enabled', False)
@@ -169,73 +264,29 @@ class Config:
     def validate_aws_credentials(self) -> bool:
         """Validate AWS credentials are available."""
         try:
-            import boto3
+            from aws_client import get_cached_client, invalidate_cached_client
             from botocore.exceptions import NoCredentialsError, ClientError
             
-            # Try to create a session and check credentials
-            if self.aws_profile:
-                session = boto3.Session(profile_name=self.aws_profile)
-            else:
-                session = boto3.Session()
-            
             # Try to get caller identity (minimal API call)
-            sts_client = session.client('sts', region_name=self.aws_region)
+            sts_client = get_cached_client('sts', self.aws_profile, self.aws_region)
             sts_client.get_caller_identity()
             
             return True
             
         except NoCredentialsError:
             self.logger.error("AWS credentials not found")
+            # Don't keep a client without credentials, so configuring them
+            # later takes effect without a restart
+            invalidate_cached_client('sts', self.aws_profile, self.aws_region)
             return False
         except ClientError as e:
             self.logger.error(f"AWS credentials validation failed: {e}")
+            invalidate_cached_client('sts', self.aws_profile, self.aws_region)
             return False
         except ImportError:
             self.logger.error("boto3 not installed")
             return False
     
     def get_aws_free_tier_services(self) -> Dict[str, Dict[str, Any]]:
-        """Get AWS Free Tier service definitions with limits."""
-        return {
-            'ec2': {
-                'name': 'Amazon Elastic Compute Cloud - Compute',
-                'limits': {
-                    't2.micro': {'value': 750, 'unit': 'hours', 'period': 'monthly'}
-                },
-                'description': 'Free t2.micro instance for 750 hours per month'
-            },
-            's3': {
-                'name': 'Amazon Simple Storage Service',
-                'limits': {
-                    'Standard Storage': {'value': 5, 'unit': 'GB', 'period': 'monthly'},
-                    'GET Requests': {'value': 20000, 'unit': 'requests', 'period': 'monthly'},
-                    'PUT Requests': {'value': 2000, 'unit': 'requests', 'period': 'monthly'}
-                },
-                'description': '5 GB storage, 20K GET requests, 2K PUT requests per month'
-            },
-            'lambda': {
-                'name': 'AWS Lambda',
-                'limits': {
-                    'Requests': {'value': 1000000, 'unit': 'requests', 'period': 'monthly'},
-                    'Duration': {'value': 400000, 'unit': 'GB-seconds', 'period': 'monthly'}
-                },
-                'description': '1M free requests and 400K GB-seconds per month'
-            },
-            'rds': {
-                'name': 'Amazon Relational Database Service',
-                'limits': {
-                    'db.t2.micro': {'value': 750, 'unit': 'hours', 'period': 'monthly'},
-                    'Storage': {'value': 20, 'unit': 'GB', 'period': 'monthly'}
-                },
-                'description': 'db.t2.micro for 750 hours and 20 GB storage per month'
-            },
-            'dynamodb': {
-                'name': 'Amazon DynamoDB',
-                'limits': {
-                    'Storage': {'value': 25, 'unit': 'GB', 'period': 'monthly'},
-                    'Read Capacity': {'value': 25, 'unit': 'RCU', 'period': 'monthly'},
-                    'Write Capacity': {'value': 25, 'unit': 'WCU', 'period': 'monthly'}
-                },
-                'description': '25 GB storage, 25 RCU, 25 WCU per month'
-            }
-        }
+        """Get AWS Free Tier service definitions with limits (shared, do not modify)."""
+        return _FREE_TIER_SERVICES
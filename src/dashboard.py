@@ -4,18 +4,129 @@ Simple web dashboard for AWS free tier usage monitoring.
 """
 
 import dash
-from dash import dcc, html, Input, Output, dash_table
+from dash import dcc, html, Input, Output, State, dash_table, no_update
 import plotly.graph_objs as go
-import plotly.express as px
-import pandas as pd
-from datetime import datetime, timedelta
-import sqlite3
-from typing import Dict, List, Any
+import plotly.io as pio
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import hashlib
+import json
 import logging
+import os
+import threading
 
 from database import DatabaseManager
 from config import Config
 
+# Dash serializes figures through plotly.io.json, which is much faster with
+# orjson's native float encoding when it is installed; the usage rows hash
+# below uses it too
+try:
+    import orjson
+except ImportError:
+    orjson = None
+else:
+    pio.json.config.default_engine = 'orjson'
+
+
+# Recommendation shown when a service is at 80%+ of its free tier, by service name
+_RECS = {
+    'Amazon Elastic Compute Cloud - Compute': {
+        'icon': '🖥️',
+        'title': 'EC2 Optimization',
+        'desc': 'Stop instances when not needed to stay within 750 hours/month',
+        'priority': 'High'
+    },
+    'Amazon Simple Storage Service': {
+        'icon': '💾',
+        'title': 'S3 Storage Review',
+        'desc': 'Consider lifecycle policies or delete unused files',
+        'priority': 'Medium'
+    },
+    'AWS Lambda': {
+        'icon': '⚡',
+        'title': 'Lambda Optimization',
+        'desc': 'Optimize memory allocation and execution time',
+        'priority': 'Medium'
+    }
+}
+
+# Shown when no service-specific recommendation applies
+_GENERAL_RECS = (
+    {
+        'icon': '💰',
+        'title': 'Set up AWS Budgets',
+        'desc': 'Create a $0.01 budget with email alerts',
+        'priority': 'High'
+    },
+    {
+        'icon': '📊',
+        'title': 'Enable Cost Anomaly Detection',
+        'desc': 'Free AWS service to detect unusual spending',
+        'priority': 'Medium'
+    }
+)
+
+
+# How often the background refresher checks the database for changes
+_STATE_REFRESH_SECONDS = 60
+
+# Component styles, shared by every refresh instead of rebuilt per element
+_ICON_STYLE = {'marginRight': '10px'}
+
+_ALERT_STYLE = {
+    'padding': '10px',
+    'margin': '5px 0',
+    'backgroundColor': '#fff5f5',
+    'borderRadius': '5px'
+}
+_CRITICAL_ALERT_STYLE = {**_ALERT_STYLE, 'border': '1px solid #e74c3c'}
+_WARNING_ALERT_STYLE = {**_ALERT_STYLE, 'border': '1px solid #e67e22'}
+
+_ALL_CLEAR_STYLE = {
+    'padding': '10px',
+    'backgroundColor': '#f0fff4',
+    'border': '1px solid #27ae60',
+    'borderRadius': '5px',
+    'color': '#27ae60'
+}
+
+_RECOMMENDATION_STYLE = {
+    'padding': '10px',
+    'margin': '5px 0',
+    'backgroundColor': '#f8f9fa',
+    'border': '1px solid #dee2e6',
+    'borderRadius': '5px'
+}
+_HIGH_PRIORITY_STYLE = {'color': '#e74c3c', 'fontWeight': 'bold'}
+_OTHER_PRIORITY_STYLE = {'color': '#f39c12', 'fontWeight': 'bold'}
+
+
+# Detailed usage table layout, in the key order create_usage_table builds rows with
+_TABLE_COLUMNS = [
+    {"name": name, "id": name}
+    for name in ('Service', 'Usage Type', 'Current Usage', 'Free Tier Limit',
+                 'Usage %', 'Remaining', 'Status')
+]
+_TABLE_CELL_STYLE = {'textAlign': 'left', 'padding': '10px'}
+_TABLE_STATUS_STYLES = [
+    {
+        'if': {'filter_query': '{Status} = Critical'},
+        'backgroundColor': '#fee',
+        'color': 'black',
+    },
+    {
+        'if': {'filter_query': '{Status} = Warning'},
+        'backgroundColor': '#fff3cd',
+        'color': 'black',
+    }
+]
+_TABLE_HEADER_STYLE = {
+    'backgroundColor': '#3498db',
+    'color': 'white',
+    'fontWeight': 'bold'
+}
+
 
 class FreeTierDashboard:
     """Free tier usage dashboard using Dash."""
@@ -23,9 +134,15 @@ class FreeTierDashboard:
     def __init__(self, config: Config):
         """Initialize dashboard."""
         self.config = config
-        self.db_manager = DatabaseManager(config.database_path)
+        self.db_manager = DatabaseManager(config.database_path, read_only=True)
         self.logger = logging.getLogger(__name__)
         
+        # (key, components) of the last update, kept current by
+        # _refresh_state (see run)
+        self._cached_state = None
+        self._state_lock = threading.Lock()
+        self._stop_refresh = threading.Event()
+        
         # Initialize Dash app
         self.app = dash.Dash(__name__, external_stylesheets=[
             'https://codepen.io/chriddyp/pen/bWLwgP.css'
@@ -69,6 +186,9 @@ class FreeTierDashboard:
                 n_intervals=0
             ),
             
+            # Hash of the rows last sent to the usage table
+            dcc.Store(id='usage-rows-cache'),
+            
             # Footer
             html.Div([
                 html.Hr(),
@@ -90,58 +210,112 @@ class FreeTierDashboard:
              Output('cost-trend-chart', 'figure'),
              Output('recommendations-section', 'children'),
              Output('usage-table', 'children'),
-             Output('last-updated', 'children')],
-            [Input('interval-component', 'n_intervals')]
+             Output('usage-rows-cache', 'data')],
+            [Input('interval-component', 'n_intervals')],
+            [State('usage-rows-cache', 'data')]
         )
-        def update_dashboard(n):
+        def update_dashboard(n, sent_rows_hash):
             """Update all dashboard components."""
+            # Serve the state the background refresher last built; only the
+            # very first request has to build it here
+            (overview_fig, alerts_section, cost_trend_fig, recommendations,
+             usage_table, rows_hash) = (self._cached_state or self._refresh_state())[1]
             
-            # Get current usage data
-            current_month = datetime.now().strftime('%Y-%m')
-            usage_status = self.db_manager.check_free_tier_usage(current_month)
-            
-            # 1. Usage Overview Chart
-            overview_fig = self.create_usage_overview_chart(usage_status)
-            
-            # 2. Alerts Section
-            alerts_section = self.create_alerts_section(usage_status)
-            
-            # 3. Cost Trend Chart
-            cost_trend_fig = self.create_cost_trend_chart()
+            # Alerts, recommendations and the table are built from these rows
+            # alone, so don't re-send them when the browser already holds them
+            if rows_hash == sent_rows_hash:
+                alerts_section = recommendations = usage_table = rows_hash = no_update
             
-            # 4. Recommendations
-            recommendations = self.create_recommendations_section(usage_status)
-            
-            # 5. Usage Table
-            usage_table = self.create_usage_table(usage_status)
+            return (overview_fig, alerts_section, cost_trend_fig, recommendations,
+                   usage_table, rows_hash)
+        
+        # Last updated time, stamped in the browser (local time) on each refresh
+        self.app.clientside_callback(
+            """
+            function(n) {
+                var now = new Date();
+                now.setMinutes(now.getMinutes() - now.getTimezoneOffset());
+                return now.toISOString().replace('T', ' ').slice(0, 19);
+            }
+            """,
+            Output('last-updated', 'children'),
+            Input('interval-component', 'n_intervals')
+        )
+    
+    def _refresh_state(self) -> Tuple[Any, ...]:
+        """Rebuild the cached (key, components) if the day or database changed."""
+        with self._state_lock:
+            today = datetime.now().date()
             
-            # 6. Last updated time
-            last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            # Reuse the last result while the database files are untouched
+            state_key = (today, self._db_version())
+            if self._cached_state is None or self._cached_state[0] != state_key:
+                self._cached_state = (state_key, self._compute_dashboard_state(today))
             
-            return (overview_fig, alerts_section, cost_trend_fig, 
-                   recommendations, usage_table, last_updated)
+            return self._cached_state
     
-    def create_usage_overview_chart(self, usage_status: List[Dict]) -> go.Figure:
-        """Create usage overview donut chart."""
-        if not usage_status:
+    def _refresh_state_loop(self):
+        """Keep the cached state current so callbacks never wait on SQL."""
+        while not self._stop_refresh.wait(_STATE_REFRESH_SECONDS):
+            try:
+                self._refresh_state()
+            except Exception as e:
+                self.logger.error(f"Dashboard state refresh failed: {e}")
+    
+    def _db_version(self) -> Tuple[Optional[int], ...]:
+        """Modification times of the database and its WAL file (None if missing)."""
+        db_path = self.config.database_path
+        versions = []
+        for path in (db_path, f"{db_path}-wal"):
+            try:
+                versions.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                versions.append(None)
+        return tuple(versions)
+    
+    def _compute_dashboard_state(self, today) -> Tuple[Any, ...]:
+        """Build every data-driven dashboard component for the given day."""
+        # Get current usage data (the month is taken from today's date)
+        usage_status = self.db_manager.check_free_tier_usage(today)
+        
+        # 1. Usage Overview Chart
+        category_counts = self.db_manager.get_usage_category_counts(today)
+        overview_fig = self.create_usage_overview_chart(category_counts)
+        
+        # 2. Alerts Section
+        alerts_section = self.create_alerts_section(usage_status)
+        
+        # 3. Cost Trend Chart
+        cost_trend_fig = self.create_cost_trend_chart()
+        
+        # 4. Recommendations
+        recommendations = self.create_recommendations_section(usage_status)
+        
+        # 5. Usage Table, with a hash of its rows to detect unchanged data
+        usage_table = self.create_usage_table(usage_status)
+        if orjson is not None:
+            rows_json = orjson.dumps(usage_status, default=str, option=orjson.OPT_SORT_KEYS)
+        else:
+            rows_json = json.dumps(usage_status, sort_keys=True, default=str).encode()
+        rows_hash = hashlib.blake2b(rows_json, digest_size=8).hexdigest()
+        
+        return (overview_fig, alerts_section, cost_trend_fig, 
+               recommendations, usage_table, rows_hash)
+    
+    def create_usage_overview_chart(self, category_counts: Dict[str, int]) -> go.Figure:
+        """Create usage overview donut chart from DatabaseManager.get_usage_category_counts."""
+        if not any(category_counts.values()):
             return go.Figure().add_annotation(text="No data available", 
                                             xref="paper", yref="paper",
                                             x=0.5, y=0.5, showarrow=False)
         
-        # Categorize services by usage level
-        categories = {'Safe (0-50%)': 0, 'Moderate (50-75%)': 0, 
-                     'Warning (75-90%)': 0, 'Critical (90%+)': 0}
-        
-        for service in usage_status:
-            usage_pct = service.get('usage_percentage', 0)
-            if usage_pct >= 90:
-                categories['Critical (90%+)'] += 1
-            elif usage_pct >= 75:
-                categories['Warning (75-90%)'] += 1
-            elif usage_pct >= 50:
-                categories['Moderate (50-75%)'] += 1
-            else:
-                categories['Safe (0-50%)'] += 1
+        # Services by usage level, counted in SQL
+        categories = {
+            'Safe (0-50%)': category_counts['safe'],
+            'Moderate (50-75%)': category_counts['moderate'],
+            'Warning (75-90%)': category_counts['warning'],
+            'Critical (90%+)': category_counts['critical']
+        }
         
         colors = ['#27ae60', '#f39c12', '#e67e22', '#e74c3c']
         
@@ -161,39 +335,23 @@ class FreeTierDashboard:
     
     def create_alerts_section(self, usage_status: List[Dict]) -> html.Div:
         """Create alerts section."""
-        alerts = []
-        
-        for service in usage_status:
-            usage_pct = service.get('usage_percentage', 0)
-            if usage_pct >= 75:  # Warning or critical
-                alert_color = '#e74c3c' if usage_pct >= 90 else '#e67e22'
-                icon = '🚨' if usage_pct >= 90 else '⚠️'
-                
-                alerts.append(html.Div([
-                    html.Span(icon, style={'marginRight': '10px'}),
-                    html.Strong(f"{service['service']}: "),
-                    f"{usage_pct:.1f}% of free tier used",
-                    html.Br(),
-                    html.Small(f"({service['total_usage']:.1f} / {service['free_tier_limit']:.1f} {service['usage_unit']})")
-                ], style={
-                    'padding': '10px',
-                    'margin': '5px 0',
-                    'backgroundColor': '#fff5f5',
-                    'border': f'1px solid {alert_color}',
-                    'borderRadius': '5px'
-                }))
+        alerts = [
+            html.Div([
+                html.Span('🚨' if service['usage_percentage'] >= 90 else '⚠️', style=_ICON_STYLE),
+                html.Strong(f"{service['service']}: "),
+                f"{service['usage_percentage']:.1f}% of free tier used",
+                html.Br(),
+                html.Small(f"({service['total_usage']:.1f} / {service['free_tier_limit']:.1f} {service['usage_unit']})")
+            ], style=_CRITICAL_ALERT_STYLE if service['usage_percentage'] >= 90 else _WARNING_ALERT_STYLE)
+            for service in usage_status
+            if service.get('usage_percentage', 0) >= 75  # Warning or critical
+        ]
         
         if not alerts:
             return html.Div([
-                html.Span("✅", style={'marginRight': '10px'}),
+                html.Span("✅", style=_ICON_STYLE),
                 "All services are within safe usage limits!"
-            ], style={
-                'padding': '10px',
-                'backgroundColor': '#f0fff4',
-                'border': '1px solid #27ae60',
-                'borderRadius': '5px',
-                'color': '#27ae60'
-            })
+            ], style=_ALL_CLEAR_STYLE)
         
         return html.Div(alerts)
     
@@ -206,15 +364,13 @@ class FreeTierDashboard:
                                             xref="paper", yref="paper",
                                             x=0.5, y=0.5, showarrow=False)
         
-        df = pd.DataFrame(cost_data)
-        df['date'] = pd.to_datetime(df['date'])
-        
         fig = go.Figure()
         
-        # Daily cost line
-        fig.add_trace(go.Scatter(
-            x=df['date'],
-            y=df['daily_cost'],
+        # Daily cost line, drawn with WebGL (Scattergl) rather than SVG;
+        # plotly reads the ISO date strings as a date axis
+        fig.add_trace(go.Scattergl(
+            x=[row['date'] for row in cost_data],
+            y=[row['daily_cost'] for row in cost_data],
             mode='lines+markers',
             name='Daily Cost',
             line={'color': '#3498db', 'width': 2}
@@ -240,66 +396,25 @@ class FreeTierDashboard:
         recommendations = []
         
         for service in usage_status:
-            usage_pct = service.get('usage_percentage', 0)
-            service_name = service['service']
-            
-            if usage_pct >= 80:
-                if 'Compute Cloud' in service_name:
-                    recommendations.append({
-                        'icon': '🖥️',
-                        'title': 'EC2 Optimization',
-                        'desc': 'Stop instances when not needed to stay within 750 hours/month',
-                        'priority': 'High'
-                    })
-                elif 'Storage Service' in service_name:
-                    recommendations.append({
-                        'icon': '💾',
-                        'title': 'S3 Storage Review',
-                        'desc': 'Consider lifecycle policies or delete unused files',
-                        'priority': 'Medium'
-                    })
-                elif 'Lambda' in service_name:
-                    recommendations.append({
-                        'icon': '⚡',
-                        'title': 'Lambda Optimization',
-                        'desc': 'Optimize memory allocation and execution time',
-                        'priority': 'Medium'
-                    })
+            rec = _RECS.get(service['service'])
+            if rec and service.get('usage_percentage', 0) >= 80:
+                recommendations.append(rec)
         
         # Add general recommendations
         if not recommendations:
-            recommendations = [
-                {
-                    'icon': '💰',
-                    'title': 'Set up AWS Budgets',
-                    'desc': 'Create a $0.01 budget with email alerts',
-                    'priority': 'High'
-                },
-                {
-                    'icon': '📊',
-                    'title': 'Enable Cost Anomaly Detection',
-                    'desc': 'Free AWS service to detect unusual spending',
-                    'priority': 'Medium'
-                }
-            ]
-        
-        rec_elements = []
-        for rec in recommendations:
-            color = '#e74c3c' if rec['priority'] == 'High' else '#f39c12'
-            rec_elements.append(html.Div([
-                html.Span(rec['icon'], style={'marginRight': '10px'}),
+            recommendations = list(_GENERAL_RECS)
+        
+        rec_elements = [
+            html.Div([
+                html.Span(rec['icon'], style=_ICON_STYLE),
                 html.Strong(rec['title']),
                 html.Br(),
                 rec['desc'],
                 html.Span(f" [{rec['priority']} Priority]", 
-                         style={'color': color, 'fontWeight': 'bold'})
-            ], style={
-                'padding': '10px',
-                'margin': '5px 0',
-                'backgroundColor': '#f8f9fa',
-                'border': '1px solid #dee2e6',
-                'borderRadius': '5px'
-            }))
+                         style=_HIGH_PRIORITY_STYLE if rec['priority'] == 'High' else _OTHER_PRIORITY_STYLE)
+            ], style=_RECOMMENDATION_STYLE)
+            for rec in recommendations
+        ]
         
         return html.Div(rec_elements)
     
@@ -323,26 +438,13 @@ class FreeTierDashboard:
         
         return dash_table.DataTable(
             data=table_data,
-            columns=[{"name": i, "id": i} for i in table_data[0].keys() if table_data],
-            style_cell={'textAlign': 'left', 'padding': '10px'},
-            style_data_conditional=[
-                {
-                    'if': {'filter_query': '{Status} = Critical'},
-                    'backgroundColor': '#fee',
-                    'color': 'black',
-                },
-                {
-                    'if': {'filter_query': '{Status} = Warning'},
-                    'backgroundColor': '#fff3cd',
-                    'color': 'black',
-                }
-            ],
-            style_header={
-                'backgroundColor': '#3498db',
-                'color': 'white',
-                'fontWeight': 'bold'
-            },
-            sort_action="native"
+            columns=_TABLE_COLUMNS,
+            style_cell=_TABLE_CELL_STYLE,
+            style_data_conditional=_TABLE_STATUS_STYLES,
+            style_header=_TABLE_HEADER_STYLE,
+            sort_action="native",
+            page_action="native",
+            page_size=25
         )
     
     def run(self, debug=False):
@@ -350,8 +452,15 @@ class FreeTierDashboard:
         host = self.config.get('dashboard.host', 'localhost')
         port = self.config.get('dashboard.port', 8050)
         
+        # Precompute in the background, off the request threads
+        threading.Thread(target=self._refresh_state_loop, name='dashboard-refresh',
+                         daemon=True).start()
+        
         self.logger.info(f"Starting dashboard server at http://{host}:{port}")
-        self.app.run_server(debug=debug, host=host, port=port)
+        try:
+            self.app.run_server(debug=debug, host=host, port=port)
+        finally:
+            self._stop_refresh.set()
 
 
 if __name__ == "__main__":
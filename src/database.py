@@ -4,44 +4,222 @@ Database manager for SQLite operations focused on free tier usage tracking.
 
 import sqlite3
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import chain, islice
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+
+# Daily usage rows. Limits are not stored per row: they are fully determined
+# by (service, usage_type) and joined from free_tier_limits at query time.
+_USAGE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        service TEXT NOT NULL,
+        usage_type TEXT NOT NULL,
+        usage_amount REAL NOT NULL,
+        usage_unit TEXT NOT NULL,
+        cost REAL DEFAULT 0.0,
+        is_free_tier BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(date, service, usage_type)
+    )
+'''
+
+# Secondary indexes on aws_free_tier_usage, dropped around bulk loads.
+# The UNIQUE(date, service, usage_type) index belongs to the table and is kept.
+_SECONDARY_INDEXES = {
+    'idx_usage_service_type': '''
+        CREATE INDEX IF NOT EXISTS idx_usage_service_type
+        ON aws_free_tier_usage(service, usage_type)
+    '''
+}
+
+
+# Per-service usage status for a [start, end) date window of {source}.
+# Percentage, remaining and alert level are derived in SQL; pct is NULL
+# when there is no (or a zero) limit, since x / NULL and x / 0 are both
+# NULL in SQLite. Thresholds compare the rounded percentage that is
+# reported, so a row shown as 75.00 is never treated as below 75
+_USAGE_STATUS_SQL = '''
+    SELECT 
+        service,
+        usage_type,
+        total_usage,
+        usage_unit,
+        free_tier_limit,
+        limit_unit,
+        avg_cost,
+        days_tracked,
+        COALESCE(ROUND(pct, 2), 0) as usage_percentage,
+        CASE WHEN pct IS NULL THEN 'unlimited'
+             ELSE MAX(0, free_tier_limit - total_usage) END as remaining,
+        CASE WHEN pct IS NULL THEN 'unknown'
+             WHEN ROUND(pct, 2) >= 90 THEN 'critical'
+             WHEN ROUND(pct, 2) >= 75 THEN 'warning'
+             WHEN ROUND(pct, 2) >= 50 THEN 'info'
+             ELSE 'ok' END as alert_level
+    FROM (
+        SELECT 
+            u.service,
+            u.usage_type,
+            SUM(u.usage_amount) as total_usage,
+            u.usage_unit,
+            l.monthly_limit as free_tier_limit,
+            COALESCE(l.unit, u.usage_unit) as limit_unit,
+            AVG(u.cost) as avg_cost,
+            COUNT(*) as days_tracked,
+            SUM(u.usage_amount) * 100.0 / l.monthly_limit as pct
+        FROM {source} u
+        LEFT JOIN free_tier_limits l
+            ON l.service = u.service AND l.usage_type = u.usage_type
+        WHERE u.date >= ? AND u.date < ?
+        GROUP BY u.service, u.usage_type
+        {having}
+    )
+'''
+
+# Summary fields export_free_tier_report reads off its usage status rows
+_SUMMARY_KEYS = ('total_services_tracked', 'at_risk_services',
+                 'critical_services', 'total_monthly_cost')
+
+
+# Usage row insert; _INSERT_BATCH_ROWS rows at a time stay within SQLite's
+# default limit of 999 bound parameters per statement
+_INSERT_USAGE_SQL = '''
+    INSERT OR REPLACE INTO aws_free_tier_usage
+    (date, service, usage_type, usage_amount, usage_unit, cost, is_free_tier)
+    VALUES '''
+_USAGE_ROW_PLACEHOLDERS = '(?, ?, ?, ?, ?, ?, ?)'
+_INSERT_BATCH_ROWS = 999 // 7
+_INSERT_USAGE_BATCH_SQL = _INSERT_USAGE_SQL + ', '.join([_USAGE_ROW_PLACEHOLDERS] * _INSERT_BATCH_ROWS)
+
+
+def month_range(month: Union[str, date]) -> Tuple[str, str]:
+    """
+    Get the [start, end) date bounds of a YYYY-MM month, or of the month a date falls in.
+    
+    Filtering with date >= start AND date < end lets SQLite use the
+    date-leading UNIQUE(date, service, usage_type) index, which a
+    strftime('%Y-%m', date) = ? comparison cannot.
+    """
+    if isinstance(month, date):
+        year, month_number = month.year, month.month
+    else:
+        year, month_number = (int(part) for part in month.split('-'))
+    next_year, next_month = (year + 1, 1) if month_number == 12 else (year, month_number + 1)
+    return f"{year:04d}-{month_number:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
 
 
 class DatabaseManager:
     """Manages SQLite database operations for free tier cost tracking."""
     
-    def __init__(self, db_path: str = "data/finops_dashboard.db"):
-        """Initialize database manager."""
+    def __init__(self, db_path: str = "data/finops_dashboard.db", read_only: bool = False):
+        """
+        Initialize database manager.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            read_only: Open the database read-only (e.g. for the dashboard);
+                the file must already exist and every write fails
+            
+        Raises:
+            FileNotFoundError: If read_only and the database file does not exist
+        """
+        # A read-only manager can't create the file, so say how to get one
+        # instead of failing with "unable to open database file" on first query
+        if read_only and not Path(db_path).exists():
+            raise FileNotFoundError(
+                f"Database {db_path} does not exist; run main.py or "
+                f"scripts/generate_sample_data.py first to collect some data"
+            )
+        
         self.db_path = db_path
+        self.read_only = read_only
         self.logger = logging.getLogger(__name__)
-        
-    def get_connection(self) -> sqlite3.Connection:
-        """Get database connection."""
-        conn = sqlite3.connect(self.db_path)
+        # One connection shared by every caller and thread, opened on first
+        # use and serialized by the lock; see get_connection
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+    
+    def __enter__(self) -> 'DatabaseManager':
+        """Open the shared connection now; it is closed when the block exits."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the shared connection, if one is open."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection in WAL mode with larger caches."""
+        # Shared across threads (e.g. Dash request threads) under self._lock
+        if self.read_only:
+            # mode=ro never takes a write lock, so a reader can't hold up the
+            # collector; query_only also rejects writes made through it
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute('PRAGMA query_only = ON')
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Unlike journal_mode (see initialize_tables), synchronous is per
+            # connection; in WAL mode NORMAL commits don't wait on an fsync each
+            conn.execute('PRAGMA synchronous = NORMAL')
         conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA cache_size = -64000')  # 64 MB
+        conn.execute('PRAGMA mmap_size = 268435456')  # 256 MB
         return conn
     
+    @contextmanager
+    def get_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Get the shared database connection for the duration of a with block.
+        
+        The connection stays open between calls, so its prepared statement
+        and page caches are kept. The block holds the lock and, like using a
+        sqlite3 connection as a context manager, commits on success and rolls
+        back on error.
+        """
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            with self._conn:
+                yield self._conn
+    
     def initialize_tables(self):
-        """Initialize database tables for free tier tracking."""
+        """Initialize database tables and indexes for free tier tracking."""
+        self.create_tables()
+        self.create_secondary_indexes()
+    
+    def create_tables(self):
+        """
+        Create the database tables, without their secondary indexes.
+        
+        For a bulk load, insert between create_tables and
+        create_secondary_indexes so each index is built once afterwards
+        instead of being updated row by row.
+        """
         with self.get_connection() as conn:
+            # WAL lets readers (e.g. the dashboard) run alongside a writer. The
+            # mode is stored in the database file, so setting it once here
+            # covers every later connection
+            conn.execute('PRAGMA journal_mode = WAL')
+            
             # AWS Free Tier usage tracking
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS aws_free_tier_usage (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    service TEXT NOT NULL,
-                    usage_type TEXT NOT NULL,
-                    usage_amount REAL NOT NULL,
-                    usage_unit TEXT NOT NULL,
-                    free_tier_limit REAL,
-                    limit_unit TEXT,
-                    cost REAL DEFAULT 0.0,
-                    is_free_tier BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(date, service, usage_type)
-                )
-            ''')
+            conn.execute(_USAGE_TABLE_SQL.format(table='aws_free_tier_usage'))
+            self._drop_usage_limit_columns(conn)
             
             # Free tier limits reference table
             conn.execute('''
@@ -73,6 +251,10 @@ class DatabaseManager:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS ix_alerts_date_level
+                ON free_tier_alerts(date, alert_level)
+            ''')
             
             # Daily cost summary for tracking
             conn.execute('''
@@ -93,6 +275,40 @@ class DatabaseManager:
             conn.commit()
             self.logger.info("Database tables initialized for free tier tracking")
     
+    def _drop_usage_limit_columns(self, conn):
+        """Migrate usage tables that still store free_tier_limit/limit_unit per row."""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(aws_free_tier_usage)')}
+        if 'free_tier_limit' not in columns:
+            return
+        
+        # Rebuild rather than ALTER TABLE DROP COLUMN, which needs SQLite 3.35+
+        conn.execute(_USAGE_TABLE_SQL.format(table='aws_free_tier_usage_new'))
+        conn.execute('''
+            INSERT INTO aws_free_tier_usage_new
+            (id, date, service, usage_type, usage_amount, usage_unit, cost, is_free_tier, created_at)
+            SELECT id, date, service, usage_type, usage_amount, usage_unit, cost, is_free_tier, created_at
+            FROM aws_free_tier_usage
+        ''')
+        conn.execute('DROP TABLE aws_free_tier_usage')
+        conn.execute('ALTER TABLE aws_free_tier_usage_new RENAME TO aws_free_tier_usage')
+        self.logger.info("Moved free tier limits out of aws_free_tier_usage rows")
+    
+    def drop_secondary_indexes(self):
+        """Drop secondary usage indexes before a bulk load."""
+        with self.get_connection() as conn:
+            for index_name in _SECONDARY_INDEXES:
+                conn.execute(f'DROP INDEX IF EXISTS {index_name}')
+            conn.commit()
+    
+    def create_secondary_indexes(self):
+        """(Re)create secondary usage indexes after a bulk load and refresh planner stats."""
+        with self.get_connection() as conn:
+            for create_sql in _SECONDARY_INDEXES.values():
+                conn.execute(create_sql)
+            # Let the query planner see the loaded row counts
+            conn.execute('ANALYZE')
+            conn.commit()
+    
     def _populate_free_tier_limits(self, conn):
         """Populate AWS Free Tier limits (12 months free)."""
         free_tier_limits = [
@@ -136,47 +352,118 @@ class DatabaseManager:
                 VALUES (?, ?, ?, ?, ?)
             ''', (service, usage_type, limit, unit, description))
     
-    def insert_usage_data(self, usage_records: List[Dict[str, Any]]):
-        """Insert usage data and check against free tier limits."""
-        with self.get_connection() as conn:
-            for record in usage_records:
-                # Get free tier limit for this service/usage type
-                limit_cursor = conn.execute('''
-                    SELECT monthly_limit, unit FROM free_tier_limits 
-                    WHERE service = ? AND usage_type = ?
-                ''', (record.get('service'), record.get('usage_type')))
+    def insert_usage_data(self, usage_records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert usage data and check against free tier limits.
+        
+        Records are consumed lazily, so a generator can be streamed in
+        without building the full list first.
+        
+        Returns:
+            Number of records inserted
+        """
+        return self._insert_usage_rows(
+            (
+                record.get('date'),
+                record.get('service'),
+                record.get('usage_type'),
+                record.get('usage_amount', 0.0),
+                record.get('usage_unit', ''),
+                record.get('cost', 0.0)
+            )
+            for record in usage_records
+        )
+    
+    def insert_cost_data(self, provider: str, cost_records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert provider cost and usage records (e.g. from AWSCostClient).
+        
+        Records are stored as usage rows in one batched transaction, with
+        their 'usage_quantity' as the usage amount.
+        
+        Args:
+            provider: Cloud provider the records came from ('aws' or 'gcp')
+            cost_records: Records with 'date', 'service', 'usage_type',
+                'cost' and 'usage_quantity' keys
                 
-                limit_row = limit_cursor.fetchone()
-                free_tier_limit = limit_row['monthly_limit'] if limit_row else None
-                limit_unit = limit_row['unit'] if limit_row else record.get('usage_unit', '')
+        Returns:
+            Number of records inserted
+        """
+        if provider != 'aws':
+            # Only AWS free tier usage has a table to go in
+            self.logger.warning(f"No usage table for provider '{provider}', skipping its records")
+            return 0
+        
+        return self._insert_usage_rows(
+            (
+                record['date'],
+                record['service'],
+                record['usage_type'],
+                record.get('usage_quantity', 0.0),
+                record.get('usage_unit', ''),
+                record.get('cost', 0.0)
+            )
+            for record in cost_records
+        )
+    
+    def insert_usage_columns(self, usage_columns: Dict[str, Sequence[Any]]) -> int:
+        """
+        Insert column-oriented usage data (one sequence per field).
+        
+        Args:
+            usage_columns: Mapping with 'date', 'service', 'usage_type',
+                'usage_amount', 'usage_unit' and 'cost' sequences of equal length
                 
-                # Insert usage record
-                conn.execute('''
-                    INSERT OR REPLACE INTO aws_free_tier_usage
-                    (date, service, usage_type, usage_amount, usage_unit, 
-                     free_tier_limit, limit_unit, cost, is_free_tier)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    record.get('date'),
-                    record.get('service'),
-                    record.get('usage_type'),
-                    record.get('usage_amount', 0.0),
-                    record.get('usage_unit', ''),
-                    free_tier_limit,
-                    limit_unit,
-                    record.get('cost', 0.0),
-                    record.get('cost', 0.0) == 0.0  # Assume free if cost is 0
-                ))
+        Returns:
+            Number of records inserted
+        """
+        # Array columns (e.g. numpy) are converted to plain Python values in
+        # one bulk tolist() call each rather than element by element
+        columns = [
+            column.tolist() if hasattr(column, 'tolist') else column
+            for column in (usage_columns['date'], usage_columns['service'],
+                           usage_columns['usage_type'], usage_columns['usage_amount'],
+                           usage_columns['usage_unit'], usage_columns['cost'])
+        ]
+        
+        return self._insert_usage_rows(zip(*columns))
+    
+    def _insert_usage_rows(self, rows: Iterable[Tuple]) -> int:
+        """Insert (date, service, usage_type, usage_amount, usage_unit, cost) rows."""
+        params = (
+            (usage_date, service, usage_type, usage_amount, usage_unit, cost,
+             bool(cost == 0.0))  # Assume free if cost is 0
+            for usage_date, service, usage_type, usage_amount, usage_unit, cost in rows
+        )
+        
+        inserted = 0
+        with self.get_connection() as conn:
+            # The whole batch goes in one transaction. Rows are bound
+            # _INSERT_BATCH_ROWS at a time into one multi-row INSERT (a single
+            # statement step per batch); the shorter last batch uses executemany
+            while True:
+                batch = list(islice(params, _INSERT_BATCH_ROWS))
+                if len(batch) < _INSERT_BATCH_ROWS:
+                    cursor = conn.executemany(_INSERT_USAGE_SQL + _USAGE_ROW_PLACEHOLDERS, batch)
+                    inserted += max(cursor.rowcount, 0)
+                    break
+                cursor = conn.execute(_INSERT_USAGE_BATCH_SQL, list(chain.from_iterable(batch)))
+                inserted += cursor.rowcount
             
             conn.commit()
-            self.logger.info(f"Inserted {len(usage_records)} usage records")
+            self.logger.info(f"Inserted {inserted} usage records")
+            return inserted
     
-    def check_free_tier_usage(self, month: str = None) -> List[Dict[str, Any]]:
+    def check_free_tier_usage(self, month: Union[str, date, None] = None,
+                              min_percentage: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Check current month's usage against free tier limits.
         
         Args:
-            month: Month to check (YYYY-MM format), defaults to current month
+            month: Month to check (YYYY-MM format, or a date within it),
+                defaults to current month
+            min_percentage: Only return services at or above this percentage
+                of their free tier limit (filtered in SQL)
             
         Returns:
             List of services with their usage status
@@ -184,75 +471,96 @@ class DatabaseManager:
         if not month:
             month = datetime.now().strftime('%Y-%m')
         
+        with self.get_connection() as conn:
+            query = _USAGE_STATUS_SQL.format(source='aws_free_tier_usage',
+                                             having='HAVING ? IS NULL OR ROUND(pct, 2) >= ?')
+            cursor = conn.execute(query + ' ORDER BY service, usage_type',
+                                  (*month_range(month), min_percentage, min_percentage))
+            
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_usage_category_counts(self, month: Union[str, date, None] = None) -> Dict[str, int]:
+        """
+        Count services per usage level for a month, bucketed in SQL.
+        
+        Args:
+            month: Month to check (YYYY-MM format, or a date within it),
+                defaults to current month
+            
+        Returns:
+            Dict with 'safe' (0-50% or no limit), 'moderate' (50-75%),
+            'warning' (75-90%) and 'critical' (90%+) service counts
+        """
+        if not month:
+            month = datetime.now().strftime('%Y-%m')
+        
         with self.get_connection() as conn:
             cursor = conn.execute('''
                 SELECT 
-                    u.service,
-                    u.usage_type,
-                    SUM(u.usage_amount) as total_usage,
-                    u.usage_unit,
-                    u.free_tier_limit,
-                    u.limit_unit,
-                    AVG(u.cost) as avg_cost,
-                    COUNT(*) as days_tracked
-                FROM aws_free_tier_usage u
-                WHERE strftime('%Y-%m', u.date) = ?
-                GROUP BY u.service, u.usage_type
-                ORDER BY u.service, u.usage_type
-            ''', (month,))
-            
-            usage_status = []
-            for row in cursor.fetchall():
-                row_dict = dict(row)
-                if row_dict['free_tier_limit']:
-                    usage_percentage = (row_dict['total_usage'] / row_dict['free_tier_limit']) * 100
-                    row_dict['usage_percentage'] = round(usage_percentage, 2)
-                    row_dict['remaining'] = max(0, row_dict['free_tier_limit'] - row_dict['total_usage'])
-                    
-                    # Determine alert level
-                    if usage_percentage >= 90:
-                        row_dict['alert_level'] = 'critical'
-                    elif usage_percentage >= 75:
-                        row_dict['alert_level'] = 'warning'
-                    elif usage_percentage >= 50:
-                        row_dict['alert_level'] = 'info'
-                    else:
-                        row_dict['alert_level'] = 'ok'
-                else:
-                    row_dict['usage_percentage'] = 0
-                    row_dict['remaining'] = 'unlimited'
-                    row_dict['alert_level'] = 'unknown'
-                
-                usage_status.append(row_dict)
+                    COALESCE(SUM(CASE WHEN pct IS NULL OR pct < 50 THEN 1 ELSE 0 END), 0) as safe,
+                    COALESCE(SUM(CASE WHEN pct >= 50 AND pct < 75 THEN 1 ELSE 0 END), 0) as moderate,
+                    COALESCE(SUM(CASE WHEN pct >= 75 AND pct < 90 THEN 1 ELSE 0 END), 0) as warning,
+                    COALESCE(SUM(CASE WHEN pct >= 90 THEN 1 ELSE 0 END), 0) as critical
+                FROM (
+                    SELECT SUM(u.usage_amount) * 100.0 / l.monthly_limit as pct
+                    FROM aws_free_tier_usage u
+                    LEFT JOIN free_tier_limits l
+                        ON l.service = u.service AND l.usage_type = u.usage_type
+                    WHERE u.date >= ? AND u.date < ?
+                    GROUP BY u.service, u.usage_type
+                )
+            ''', month_range(month))
             
-            return usage_status
+            return dict(cursor.fetchone())
+    
+    def _alert_level_and_message(self, service: str, usage_type: str,
+                                 usage_percentage: float) -> Optional[Tuple[str, str]]:
+        """Return (alert_level, message) for a usage percentage, or None below warning."""
+        if usage_percentage >= 90:
+            return 'critical', f"CRITICAL: {service} {usage_type} usage at {usage_percentage:.1f}% of free tier limit"
+        elif usage_percentage >= 75:
+            return 'warning', f"WARNING: {service} {usage_type} usage at {usage_percentage:.1f}% of free tier limit"
+        return None  # Don't create alert for lower usage
     
     def create_free_tier_alert(self, service: str, usage_type: str, 
                               current_usage: float, limit_value: float):
-        """Create an alert for free tier usage."""
-        usage_percentage = (current_usage / limit_value) * 100
+        """Create an alert for free tier usage (see create_free_tier_alerts)."""
+        self.create_free_tier_alerts([(service, usage_type, current_usage, limit_value)])
+    
+    def create_free_tier_alerts(self, alerts: Iterable[Tuple[str, str, float, float]]) -> int:
+        """
+        Create free tier alerts in a single transaction.
         
-        if usage_percentage >= 90:
-            alert_level = 'critical'
-            message = f"CRITICAL: {service} {usage_type} usage at {usage_percentage:.1f}% of free tier limit"
-        elif usage_percentage >= 75:
-            alert_level = 'warning'
-            message = f"WARNING: {service} {usage_type} usage at {usage_percentage:.1f}% of free tier limit"
-        else:
-            return  # Don't create alert for lower usage
+        Args:
+            alerts: (service, usage_type, current_usage, limit_value) tuples;
+                entries below the warning level are skipped
+                
+        Returns:
+            Number of alerts created
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        rows = []
+        
+        for service, usage_type, current_usage, limit_value in alerts:
+            usage_percentage = (current_usage / limit_value) * 100
+            level_and_message = self._alert_level_and_message(service, usage_type, usage_percentage)
+            if level_and_message:
+                rows.append((service, usage_type, current_usage, limit_value,
+                             usage_percentage, *level_and_message, today))
+        
+        if not rows:
+            return 0
         
         with self.get_connection() as conn:
-            conn.execute('''
+            conn.executemany('''
                 INSERT INTO free_tier_alerts
                 (service, usage_type, current_usage, limit_value, usage_percentage, 
                  alert_level, message, date)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                service, usage_type, current_usage, limit_value,
-                usage_percentage, alert_level, message,
-                datetime.now().strftime('%Y-%m-%d')
-            ))
+            ''', rows)
             conn.commit()
+        
+        return len(rows)
     
     def get_cost_trend(self, days: int = 30) -> List[Dict[str, Any]]:
         """Get daily cost trend for visualization."""
@@ -264,10 +572,10 @@ class DatabaseManager:
                     COUNT(DISTINCT service) as active_services,
                     SUM(CASE WHEN cost > 0 THEN cost ELSE 0 END) as paid_cost
                 FROM aws_free_tier_usage
-                WHERE date >= date('now', '-{} days')
+                WHERE date >= date('now', ?)
                 GROUP BY date
                 ORDER BY date
-            '''.format(days))
+            ''', (f'-{int(days)} days',))
             
             return [dict(row) for row in cursor.fetchall()]
     
@@ -275,12 +583,7 @@ class DatabaseManager:
         """Export comprehensive free tier usage report."""
         current_month = datetime.now().strftime('%Y-%m')
         
-        usage_status = self.check_free_tier_usage(current_month)
-        
-        # Calculate summary statistics
-        total_services = len(usage_status)
-        at_risk_services = len([s for s in usage_status if s['usage_percentage'] >= 75])
-        critical_services = len([s for s in usage_status if s['usage_percentage'] >= 90])
+        month_start, month_end = month_range(current_month)
         
         with self.get_connection() as conn:
             # Get recent alerts
@@ -292,26 +595,52 @@ class DatabaseManager:
             ''')
             recent_alerts = [dict(row) for row in cursor.fetchall()]
             
-            # Get cost trend
+            # Usage status (with the summary as window totals) and the 30 day
+            # cost trend in one statement; both read the recent CTE, which
+            # SQLite materializes once since it is referenced twice
             cursor = conn.execute('''
+                WITH recent AS (
+                    SELECT date, service, usage_type, usage_amount, usage_unit, cost
+                    FROM aws_free_tier_usage
+                    WHERE date >= MIN(?, date('now', '-30 days'))
+                ),
+                status AS ({status_sql})
                 SELECT 
-                    date,
-                    SUM(cost) as daily_cost
-                FROM aws_free_tier_usage
+                    'monthly' as kind, NULL as date, NULL as daily_cost, status.*,
+                    COUNT(*) OVER () as total_services_tracked,
+                    SUM(usage_percentage >= 75) OVER () as at_risk_services,
+                    SUM(usage_percentage >= 90) OVER () as critical_services,
+                    SUM(avg_cost * 30) OVER () as total_monthly_cost
+                FROM status
+                UNION ALL
+                SELECT 
+                    'daily', date, SUM(cost),
+                    -- the 11 status columns, then the 4 summary columns
+                    NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+                    NULL, NULL, NULL, NULL
+                FROM recent
                 WHERE date >= date('now', '-30 days')
                 GROUP BY date
-                ORDER BY date
-            ''')
-            cost_trend = [dict(row) for row in cursor.fetchall()]
+                ORDER BY kind DESC, service, usage_type, date
+            '''.format(status_sql=_USAGE_STATUS_SQL.format(source='recent', having='')),
+                (month_start, month_start, month_end))
+            
+            usage_status = []
+            cost_trend = []
+            summary = dict.fromkeys(_SUMMARY_KEYS, 0)
+            for row in cursor:
+                record = dict(row)
+                kind = record.pop('kind')
+                if kind == 'daily':
+                    cost_trend.append({'date': record['date'], 'daily_cost': record['daily_cost']})
+                    continue
+                del record['date'], record['daily_cost']
+                summary = {key: record.pop(key) for key in _SUMMARY_KEYS}
+                usage_status.append(record)
         
         return {
             'report_month': current_month,
-            'summary': {
-                'total_services_tracked': total_services,
-                'at_risk_services': at_risk_services,
-                'critical_services': critical_services,
-                'total_monthly_cost': sum(s.get('avg_cost', 0) * 30 for s in usage_status)
-            },
+            'summary': summary,
             'usage_status': usage_status,
             'recent_alerts': recent_alerts,
             'cost_trend': cost_trend,
@@ -5,26 +5,53 @@ Main application entry point for monitoring cloud resource usage and costs.
 """
 
 import logging
+import logging.handlers
 import sys
 import argparse
 from datetime import datetime, timedelta
 from typing import Optional
 
-from aws_client import AWSCostClient
-from gcp_client import GCPBillingClient
 from database import DatabaseManager
-from alerts import AlertManager
+from alerts import FreeTierAlertManager
 from config import Config
 
 
+class _LogFormatter(logging.Formatter):
+    """'asctime - name - levelname - message' built with one f-string per record."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{self.formatTime(record)} - {record.name} - {record.levelname} - {record.getMessage()}"
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        if record.stack_info:
+            line = f"{line}\n{self.formatStack(record.stack_info)}"
+        return line
+
+
 def setup_logging(level: str = 'INFO') -> None:
     """Configure logging for the application."""
+    # Records never show thread or process details, so skip collecting them
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
+    formatter = _LogFormatter()
+    file_handler = logging.FileHandler('data/finops_dashboard.log')
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    
+    # Buffer file records and write them in batches, straight away for errors;
+    # logging's exit hook flushes whatever is left
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=1024, flushLevel=logging.ERROR, target=file_handler
+    )
+    
     logging.basicConfig(
         level=getattr(logging, level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler('data/finops_dashboard.log'),
-            logging.StreamHandler(sys.stdout)
+            buffered_file_handler,
+            stream_handler
         ]
     )
 
@@ -50,12 +77,12 @@ def main():
         # Load configuration
         config = Config(args.config)
         
-        # Initialize database
+        # Initialize database; secondary indexes are built after the inserts
         db_manager = DatabaseManager(config.database_path)
-        db_manager.initialize_tables()
+        db_manager.create_tables()
         
         # Initialize alert manager
-        alert_manager = AlertManager(config)
+        alert_manager = FreeTierAlertManager(config, db_manager)
         
         # Calculate date range
         end_date = datetime.now().date()
@@ -65,31 +92,42 @@ def main():
         
         # Process AWS data if configured
         if args.provider in ['aws', 'both'] and config.aws_enabled:
+            # Provider SDKs are imported only for the providers actually fetched
+            from aws_client import AWSCostClient
+            
             logger.info("Processing AWS cost data...")
             aws_client = AWSCostClient(config)
-            aws_data = aws_client.get_cost_and_usage(start_date, end_date)
-            db_manager.insert_cost_data('aws', aws_data)
             
-            # Check for alerts
-            aws_alerts = alert_manager.check_aws_alerts(aws_data)
-            if aws_alerts:
+            # Cost Explorer bills every request, so the window is fetched in
+            # one paged request unless one concurrent request per day is
+            # opted into. Either way each page (or day) of records is stored
+            # as it arrives, so only one is held in memory at a time
+            if config.aws_parallel_requests:
+                aws_chunks = aws_client.iter_cost_and_usage_parallel(start_date, end_date)
+            else:
+                aws_chunks = aws_client.iter_cost_and_usage_pages(start_date, end_date)
+            
+            aws_records = 0
+            for aws_chunk in aws_chunks:
+                aws_records += db_manager.insert_cost_data('aws', aws_chunk)
+            logger.info(f"Stored {aws_records} AWS cost records")
+            
+            # Check for alerts, once everything is stored
+            aws_alerts = alert_manager.check_free_tier_alerts()
+            # Skip formatting every alert when warnings are filtered out
+            if aws_alerts and logger.isEnabledFor(logging.WARNING):
                 logger.warning(f"AWS alerts triggered: {len(aws_alerts)}")
                 for alert in aws_alerts:
                     logger.warning(f"Alert: {alert}")
         
-        # Process GCP data if configured
+        # There is no GCP billing client yet, so GCP is skipped rather than
+        # failing the whole run
         if args.provider in ['gcp', 'both'] and config.gcp_enabled:
-            logger.info("Processing GCP billing data...")
-            gcp_client = GCPBillingClient(config)
-            gcp_data = gcp_client.get_billing_data(start_date, end_date)
-            db_manager.insert_cost_data('gcp', gcp_data)
-            
-            # Check for alerts
-            gcp_alerts = alert_manager.check_gcp_alerts(gcp_data)
-            if gcp_alerts:
-                logger.warning(f"GCP alerts triggered: {len(gcp_alerts)}")
-                for alert in gcp_alerts:
-                    logger.warning(f"Alert: {alert}")
+            logger.warning("GCP billing support is not available yet, skipping GCP")
+        
+        # No-op for indexes that already exist (repeat runs append to an
+        # indexed table); either way refreshes the planner statistics
+        db_manager.create_secondary_indexes()
         
         logger.info("Data processing completed successfully")
         
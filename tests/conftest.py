@@ -0,0 +1,11 @@
+"""
+Pytest configuration: make the modules in src/ importable by the tests.
+"""
+
+import sys
+from pathlib import Path
+
+# Added once, before any test module is collected
+SRC_DIR = str(Path(__file__).resolve().parent.parent / 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
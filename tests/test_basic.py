@@ -5,33 +5,65 @@ Tests core functionality without requiring real AWS credentials.
 """
 
 import unittest
+import io
 import sys
 import os
 import tempfile
 import shutil
+import sqlite3
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Add src to path when run directly (e.g. by scripts/quick_start.py); under
+# pytest, conftest.py has already done it
+SRC_DIR = str(Path(__file__).resolve().parent.parent / 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+SCRIPTS_DIR = str(Path(__file__).resolve().parent.parent / 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
 
 from database import DatabaseManager
 from config import Config
 from alerts import FreeTierAlertManager
+from generate_sample_data import generate_sample_aws_data, iter_sample_aws_data
+
+
+def clear_test_data(db_manager):
+    """Empty the usage and alert tables, keeping the schema and seeded limits."""
+    with db_manager.get_connection() as conn:
+        conn.execute("DELETE FROM aws_free_tier_usage")
+        conn.execute("DELETE FROM free_tier_alerts")
 
 
 class TestDatabaseManager(unittest.TestCase):
     """Test database operations."""
     
-    def setUp(self):
-        """Set up test database."""
-        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.test_db.close()
-        self.db_manager = DatabaseManager(self.test_db.name)
-        self.db_manager.initialize_tables()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one in-memory test database for the class."""
+        cls.db_manager = DatabaseManager(":memory:")
+        cls.db_manager.initialize_tables()
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up test database."""
-        os.unlink(self.test_db.name)
+        cls.db_manager.close()
+    
+    def setUp(self):
+        """Start each test from empty data tables."""
+        clear_test_data(self.db_manager)
+    
+    def make_db_file(self) -> str:
+        """Create an initialized on-disk database, removed after the test."""
+        test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        test_db.close()
+        self.addCleanup(os.unlink, test_db.name)
+        with DatabaseManager(test_db.name) as db_manager:
+            db_manager.initialize_tables()
+        return test_db.name
     
     def test_database_initialization(self):
         """Test database table creation."""
@@ -84,6 +116,25 @@ class TestDatabaseManager(unittest.TestCase):
             
             self.assertEqual(count, 2)
     
+    def test_cost_data_insertion(self):
+        """Test inserting Cost Explorer records from the AWS client."""
+        cost_records = [
+            {'date': '2024-01-15', 'service': 'AWS Lambda', 'usage_type': 'Requests',
+             'cost': 0.0, 'usage_quantity': 1200.0, 'currency': 'USD'},
+            {'date': '2024-01-16', 'service': 'AWS Lambda', 'usage_type': 'Requests',
+             'cost': 0.25, 'usage_quantity': 1500.0, 'currency': 'USD'}
+        ]
+        
+        self.assertEqual(self.db_manager.insert_cost_data('aws', cost_records), 2)
+        self.assertEqual(self.db_manager.insert_cost_data('gcp', cost_records), 0)
+        
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT usage_amount, is_free_tier FROM aws_free_tier_usage ORDER BY date"
+            ).fetchall()
+        
+        self.assertEqual([tuple(row) for row in rows], [(1200.0, 1), (1500.0, 0)])
+    
     def test_free_tier_usage_check(self):
         """Test checking free tier usage against limits."""
         # Insert test data
@@ -107,18 +158,114 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertGreater(len(usage_status), 0)
         
         # Find the EC2 entry
-        ec2_usage = next((s for s in usage_status if 'Compute Cloud' in s['service']), None)
+        usage_by_key = {(s['service'], s['usage_type']): s for s in usage_status}
+        ec2_usage = usage_by_key.get(('Amazon Elastic Compute Cloud - Compute', 't2.micro'))
         self.assertIsNotNone(ec2_usage)
         self.assertGreater(ec2_usage['usage_percentage'], 70)  # Should be high usage
+        
+        # A date selects the month it falls in
+        self.assertEqual(self.db_manager.check_free_tier_usage(datetime.now().date()), usage_status)
+        
+        # min_percentage filters on the rounded percentage that is reported
+        self.db_manager.insert_usage_data([
+            {'date': datetime.now().strftime('%Y-%m-%d'), 'service': 'AWS Lambda',
+             'usage_type': 'Requests', 'usage_amount': 749960.0, 'usage_unit': 'requests'}  # 74.996%
+        ])
+        at_risk = self.db_manager.check_free_tier_usage(current_month, min_percentage=75)
+        self.assertEqual([(s['service'], s['usage_percentage'], s['alert_level']) for s in at_risk],
+                         [('AWS Lambda', 75.0, 'warning'),
+                          ('Amazon Elastic Compute Cloud - Compute', 80.0, 'warning')])
+    
+    def test_usage_category_counts(self):
+        """Test services are bucketed by usage level in SQL."""
+        today = datetime.now().strftime('%Y-%m-%d')
+        self.db_manager.insert_usage_data([
+            {'date': today, 'service': 'Amazon Elastic Compute Cloud - Compute',
+             'usage_type': 't2.micro', 'usage_amount': 700.0, 'usage_unit': 'hours'},  # 93%
+            {'date': today, 'service': 'AWS Lambda',
+             'usage_type': 'Requests', 'usage_amount': 600000.0, 'usage_unit': 'requests'},  # 60%
+            {'date': today, 'service': 'Unknown Service',
+             'usage_type': 'Other', 'usage_amount': 1.0, 'usage_unit': 'units'}  # No limit
+        ])
+        
+        counts = self.db_manager.get_usage_category_counts(datetime.now().strftime('%Y-%m'))
+        
+        self.assertEqual(counts, {'safe': 1, 'moderate': 1, 'warning': 0, 'critical': 1})
+    
+    def test_export_free_tier_report(self):
+        """Test the report's usage status, summary and cost trend."""
+        today = datetime.now().strftime('%Y-%m-%d')
+        self.db_manager.insert_usage_data([
+            {'date': today, 'service': 'Amazon Elastic Compute Cloud - Compute',
+             'usage_type': 't2.micro', 'usage_amount': 700.0, 'usage_unit': 'hours'},  # 93%
+            {'date': today, 'service': 'AWS Lambda', 'usage_type': 'Requests',
+             'usage_amount': 749960.0, 'usage_unit': 'requests', 'cost': 0.5}  # 74.996%
+        ])
+        
+        report = self.db_manager.export_free_tier_report()
+        
+        self.assertEqual([(row['service'], row['usage_percentage']) for row in report['usage_status']],
+                         [('AWS Lambda', 75.0), ('Amazon Elastic Compute Cloud - Compute', 93.33)])
+        # Thresholds compare the rounded percentage the status rows report
+        self.assertEqual(report['summary']['total_services_tracked'], 2)
+        self.assertEqual(report['summary']['at_risk_services'], 2)
+        self.assertEqual(report['summary']['critical_services'], 1)
+        self.assertAlmostEqual(report['summary']['total_monthly_cost'], 15.0)
+        self.assertEqual(report['cost_trend'], [{'date': today, 'daily_cost': 0.5}])
+    
+    def test_create_free_tier_alerts(self):
+        """Test alerts are stored in bulk, skipping usage below the warning level."""
+        created = self.db_manager.create_free_tier_alerts([
+            ('AWS Lambda', 'Requests', 950000.0, 1000000.0),  # 95%
+            ('Amazon Simple Storage Service', 'Standard Storage', 4.0, 5.0),  # 80%
+            ('Amazon DynamoDB', 'Storage', 5.0, 25.0)  # 20%
+        ])
+        self.db_manager.create_free_tier_alert('AWS Lambda', 'Duration', 380000.0, 400000.0)
+        
+        with self.db_manager.get_connection() as conn:
+            levels = [row[0] for row in conn.execute(
+                "SELECT alert_level FROM free_tier_alerts ORDER BY id")]
+        
+        self.assertEqual(created, 2)
+        self.assertEqual(levels, ['critical', 'warning', 'critical'])
+    
+    def test_connection_is_reused(self):
+        """Test that one connection is shared across calls until closed."""
+        with DatabaseManager(self.make_db_file()) as db_manager:
+            with db_manager.get_connection() as first, db_manager.get_connection() as second:
+                self.assertIs(first, second)
+            db_manager.check_free_tier_usage()
+        
+        self.assertIsNone(db_manager._conn)
+    
+    def test_read_only_connection(self):
+        """Test a read-only manager can query but not write."""
+        with DatabaseManager(self.make_db_file(), read_only=True) as reader:
+            self.assertEqual(reader.check_free_tier_usage(), [])
+            with self.assertRaises(sqlite3.OperationalError):
+                reader.insert_usage_data([
+                    {'date': '2024-01-15', 'service': 'AWS Lambda', 'usage_type': 'Requests',
+                     'usage_amount': 1.0, 'usage_unit': 'requests'}
+                ])
+    
+    def test_read_only_missing_database(self):
+        """Test a read-only manager explains how to create a missing database."""
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        missing_db = os.path.join(test_dir, 'missing.db')
+        
+        with self.assertRaisesRegex(FileNotFoundError, 'generate_sample_data.py'):
+            DatabaseManager(missing_db, read_only=True)
 
 
 class TestConfig(unittest.TestCase):
     """Test configuration management."""
     
-    def setUp(self):
-        """Set up test configuration."""
-        self.test_config_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml')
-        self.test_config_file.write("""
+    @classmethod
+    def setUpClass(cls):
+        """Set up test configuration (read only, so shared by every test)."""
+        cls.test_config_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml')
+        cls.test_config_file.write("""
 database_path: "test.db"
 aws_region: "us-west-2"
 free_tier_focus: true
@@ -126,11 +273,12 @@ alert_thresholds:
   warning: 80.0
   critical: 95.0
 """)
-        self.test_config_file.close()
+        cls.test_config_file.close()
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up test config."""
-        os.unlink(self.test_config_file.name)
+        os.unlink(cls.test_config_file.name)
     
     def test_config_loading(self):
         """Test configuration loading from file."""
@@ -147,40 +295,45 @@ alert_thresholds:
         
         self.assertEqual(config.aws_region, "us-east-1")
         self.assertTrue(config.aws_enabled)
+        self.assertFalse(config.aws_parallel_requests)
         self.assertFalse(config.gcp_enabled)
+        
+        # Each instance has its own copy of the defaults
+        config.defaults['alert_thresholds']['warning'] = 10.0
+        self.assertEqual(Config("non_existent_config.yaml").alert_thresholds['warning'], 75.0)
+        self.assertEqual(Config("non_existent_config.yaml").defaults['alert_thresholds']['warning'], 75.0)
     
     def test_environment_override(self):
         """Test environment variable override."""
-        os.environ['AWS_REGION'] = 'eu-west-1'
-        os.environ['DATABASE_PATH'] = 'env_test.db'
-        
-        try:
+        # Restores the environment afterwards, including any values already set
+        with mock.patch.dict(os.environ, {'AWS_REGION': 'eu-west-1',
+                                          'DATABASE_PATH': 'env_test.db'}):
             config = Config("non_existent_config.yaml")
             self.assertEqual(config.aws_region, 'eu-west-1')
             self.assertEqual(config.database_path, 'env_test.db')
-        finally:
-            # Clean up environment
-            del os.environ['AWS_REGION']
-            del os.environ['DATABASE_PATH']
 
 
 class TestAlerts(unittest.TestCase):
     """Test alert functionality."""
     
-    def setUp(self):
-        """Set up test environment."""
-        self.test_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.test_db.close()
-        self.db_manager = DatabaseManager(self.test_db.name)
-        self.db_manager.initialize_tables()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one in-memory database and config; the tests only read the config."""
+        cls.db_manager = DatabaseManager(":memory:")
+        cls.db_manager.initialize_tables()
         
         # Mock config
-        self.config = Config("non_existent_config.yaml")
-        self.alert_manager = FreeTierAlertManager(self.config, self.db_manager)
+        cls.config = Config("non_existent_config.yaml")
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up."""
-        os.unlink(self.test_db.name)
+        cls.db_manager.close()
+    
+    def setUp(self):
+        """Set up test environment."""
+        clear_test_data(self.db_manager)
+        self.alert_manager = FreeTierAlertManager(self.config, self.db_manager)
     
     def test_alert_generation(self):
         """Test alert generation for high usage."""
@@ -199,13 +352,75 @@ class TestAlerts(unittest.TestCase):
         self.db_manager.insert_usage_data(high_usage_data)
         
         # Check for alerts
-        alerts = self.alert_manager.check_free_tier_alerts(high_usage_data)
+        alerts = self.alert_manager.check_free_tier_alerts()
         
         self.assertGreater(len(alerts), 0, "Should generate alerts for high usage")
         
         # Check alert severity
-        critical_alerts = [a for a in alerts if a['severity'] == 'critical']
+        critical_alerts = [a for a in alerts if a.severity == 'critical']
         self.assertGreater(len(critical_alerts), 0, "Should have critical alerts for 90%+ usage")
+        
+        # Check alerts were stored
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.execute("SELECT COUNT(*) FROM free_tier_alerts")
+            self.assertEqual(cursor.fetchone()[0], len(alerts))
+    
+    def test_check_free_tier_alerts_for_cost_data(self):
+        """Test alerts for stored Cost Explorer records."""
+        cost_data = [
+            {
+                'date': datetime.now().strftime('%Y-%m-%d'),
+                'service': 'AWS Lambda',
+                'usage_type': 'Requests',
+                'cost': 0.0,
+                'usage_quantity': 960000.0,  # 96% of 1M limit
+                'currency': 'USD'
+            }
+        ]
+        self.db_manager.insert_cost_data('aws', cost_data)
+        
+        self.assertTrue(any(self.alert_manager.iter_free_tier_alerts()))
+        alerts = self.alert_manager.check_free_tier_alerts()
+        
+        self.assertEqual([(a.service, a.severity) for a in alerts], [('AWS Lambda', 'critical')])
+        
+        # Only check_free_tier_alerts stores what it finds
+        with self.db_manager.get_connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM free_tier_alerts").fetchone()[0], 1)
+    
+    def test_predict_free_tier_breach_all(self):
+        """Test breach prediction across all services matches the single lookup."""
+        self.db_manager.insert_usage_data([
+            {
+                'date': datetime.now().strftime('%Y-%m-%d'),
+                'service': 'Amazon Elastic Compute Cloud - Compute',
+                'usage_type': 't2.micro',
+                'usage_amount': 700.0,  # Projects well past the 750 hour limit
+                'usage_unit': 'hours',
+                'cost': 0.0
+            }
+        ])
+        
+        predictions = self.alert_manager.predict_free_tier_breach_all()
+        
+        self.assertEqual(len(predictions), 1)
+        self.assertEqual(predictions[0], self.alert_manager.predict_free_tier_breach(
+            'Amazon Elastic Compute Cloud - Compute', 't2.micro'))
+    
+    def test_weekly_alert_summary(self):
+        """Test weekly summary folds alerts by level and by day."""
+        self.db_manager.create_free_tier_alerts([
+            ('Amazon Elastic Compute Cloud - Compute', 't2.micro', 700.0, 750.0),
+            ('AWS Lambda', 'Requests', 800000.0, 1000000.0),
+            ('AWS Lambda', 'Duration', 380000.0, 400000.0)
+        ])
+        
+        summary = self.alert_manager.generate_weekly_alert_summary()
+        
+        self.assertEqual(summary['total_alerts'], 3)
+        self.assertEqual(summary['alerts_by_level']['critical']['count'], 2)
+        self.assertEqual(summary['alerts_by_level']['warning']['services'], ['AWS Lambda'])
+        self.assertEqual(sum(day['alerts'] for day in summary['daily_trend']), 3)
     
     def test_recommendations(self):
         """Test recommendation generation."""
@@ -217,40 +432,44 @@ class TestAlerts(unittest.TestCase):
         self.assertGreater(len(recommendations), 0, "Should always have basic recommendations")
         
         # Check for general recommendations
-        budget_rec = next((r for r in recommendations if 'Budget' in r['title']), None)
-        self.assertIsNotNone(budget_rec, "Should recommend setting up AWS Budgets")
+        recommendations_by_id = {r['id']: r for r in recommendations}
+        self.assertIn('budgets', recommendations_by_id, "Should recommend setting up AWS Budgets")
 
 
 class TestFreeTierLimits(unittest.TestCase):
     """Test free tier limits and calculations."""
     
-    def test_ec2_limit_calculation(self):
-        """Test EC2 usage percentage calculation."""
-        # 750 hours per month limit
-        # 24 hours/day * 31 days = 744 hours = 99.2% usage
-        usage_hours = 744
-        limit_hours = 750
-        expected_percentage = (usage_hours / limit_hours) * 100
-        
-        self.assertAlmostEqual(expected_percentage, 99.2, places=1)
-    
-    def test_s3_storage_limit(self):
-        """Test S3 storage limit calculation."""
-        # 5 GB limit
-        usage_gb = 4.8
-        limit_gb = 5.0
-        expected_percentage = (usage_gb / limit_gb) * 100
-        
-        self.assertAlmostEqual(expected_percentage, 96.0, places=1)
-    
-    def test_lambda_request_limit(self):
-        """Test Lambda request limit calculation."""
-        # 1M requests per month
-        usage_requests = 750000
-        limit_requests = 1000000
-        expected_percentage = (usage_requests / limit_requests) * 100
-        
-        self.assertAlmostEqual(expected_percentage, 75.0, places=1)
+    def test_limit_percentages(self):
+        """Test usage percentage calculations against free tier limits."""
+        cases = [
+            # (name, usage, limit, expected percentage)
+            ('EC2', 744, 750, 99.2),          # 24 hours/day * 31 days of a 750 hour limit
+            ('S3', 4.8, 5.0, 96.0),           # GB of a 5 GB limit
+            ('Lambda', 750000, 1000000, 75.0)  # Requests of a 1M limit
+        ]
+        
+        for name, usage, limit, expected_percentage in cases:
+            with self.subTest(name):
+                self.assertAlmostEqual((usage / limit) * 100, expected_percentage, places=1)
+
+
+class TestSampleData(unittest.TestCase):
+    """Test sample data generation."""
+    
+    def test_seed_pins_data(self):
+        """Test a seed gives the same data however the days are split up."""
+        expected = generate_sample_aws_data(10, seed=42)
+        
+        for workers in (2, 3):
+            with self.subTest(workers=workers):
+                data = generate_sample_aws_data(10, seed=42, workers=workers)
+                for key, column in expected.items():
+                    self.assertEqual(data[key].tolist(), column.tolist())
+        
+        chunks = list(iter_sample_aws_data(10, seed=42, chunk_days=4))
+        self.assertEqual([len(chunk['date']) for chunk in chunks], [36, 36, 18])
+        self.assertEqual([value for chunk in chunks for value in chunk['usage_amount'].tolist()],
+                         expected['usage_amount'].tolist())
 
 
 def run_tests():
@@ -258,35 +477,52 @@ def run_tests():
     print("🧪 Running FinOps Dashboard Tests...")
     print("=" * 50)
     
-    # Create test suite
-    test_classes = [
+    # Create test suite. TestConfig sets environment variables that every
+    # Config reads (TestAlerts builds one), and TestSampleData forks worker
+    # processes, so they run on their own afterwards
+    concurrent_classes = [
         TestDatabaseManager,
-        TestConfig,
         TestAlerts,
         TestFreeTierLimits
     ]
+    serial_classes = [
+        TestConfig,
+        TestSampleData
+    ]
     
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
     
-    for test_class in test_classes:
-        tests = loader.loadTestsFromTestCase(test_class)
-        suite.addTests(tests)
+    def run_test_class(test_class):
+        """Run one class's tests, buffering its report so classes don't interleave."""
+        stream = io.StringIO()
+        runner = unittest.TextTestRunner(stream=stream, verbosity=2)
+        return runner.run(loader.loadTestsFromTestCase(test_class)), stream.getvalue()
+    
+    # These classes share no databases, files or environment variables, so
+    # they run concurrently
+    with ThreadPoolExecutor(max_workers=len(concurrent_classes)) as executor:
+        class_runs = list(executor.map(run_test_class, concurrent_classes))
+    class_runs.extend(map(run_test_class, serial_classes))
+    
+    for _, report in class_runs:
+        sys.stderr.write(report)
     
-    # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    results = [class_result for class_result, _ in class_runs]
+    tests_run = sum(r.testsRun for r in results)
+    failures = sum(len(r.failures) for r in results)
+    errors = sum(len(r.errors) for r in results)
+    successful = all(r.wasSuccessful() for r in results)
     
     # Print summary
     print("\n" + "=" * 50)
-    if result.wasSuccessful():
+    if successful:
         print("✅ All tests passed!")
-        print(f"Ran {result.testsRun} tests successfully")
+        print(f"Ran {tests_run} tests successfully")
     else:
         print("❌ Some tests failed!")
-        print(f"Ran {result.testsRun} tests, {len(result.failures)} failures, {len(result.errors)} errors")
+        print(f"Ran {tests_run} tests, {failures} failures, {errors} errors")
     
-    return result.wasSuccessful()
+    return successful
 
 
 if __name__ == "__main__":